@@ -0,0 +1,6 @@
+"""Sorting engine for iPhone Photo Sorter; importable without Tk"""
+from .scanner import ScannedFile, FileTable, SourceScan, scan_source, extract_unique_years
+from .transfer import DEFAULT_COPY_WORKERS, CopyEngine, transfer_file
+from .dedup import HashIndex, DuplicateFinder
+from .destination import FolderListing
+from .engine import BACKUP_FOLDER_NAME, SortError, SortJob, backup_root_for
@@ -0,0 +1,107 @@
+import os
+import time
+import sqlite3
+import threading
+
+# Cache of what was read from source files, kept at the backup root
+CACHE_FILE_NAME = ".photo_sorter_cache.sqlite3"
+CACHE_MAX_ENTRIES = 500000
+CACHE_COMMIT_INTERVAL = 500
+
+def cache_key(scanned):
+    """Key for a scanned source file; it changes whenever the file does"""
+    # Windows scans report inode 0, so the path stands in for it there
+    return (scanned.device, scanned.inode, scanned.size, scanned.mtime_ns, '' if scanned.inode else scanned.path)
+
+class SourceCache:
+    """SQLite cache of capture dates and content hashes of source files, evicting the least recently used"""
+    def __init__(self, backup_root, max_entries=CACHE_MAX_ENTRIES):
+        self.path = os.path.join(backup_root, CACHE_FILE_NAME)
+        self.max_entries = max_entries
+        # Shared by the sort's pipeline stages, one at a time
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sources (
+                device INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                metadata_read INTEGER NOT NULL DEFAULT 0,
+                capture_ts REAL,
+                media_type TEXT,
+                partial_hash TEXT,
+                full_hash TEXT,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (device, inode, size, mtime_ns, path)
+            );
+            CREATE INDEX IF NOT EXISTS sources_by_use ON sources (last_used);
+        """)
+        self.now = int(time.time())
+        # Keys hit this run, marked used in one go when the cache closes
+        self.used = set()
+        self.uncommitted = 0
+        
+    def capture_times(self, files):
+        """Cached (timestamp, media type) of scanned files by their index in files"""
+        found = {}
+        with self.lock:
+            for index, scanned in enumerate(files):
+                key = cache_key(scanned)
+                row = self.conn.execute("SELECT capture_ts, media_type FROM sources "
+                                        "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND path = ? "
+                                        "AND metadata_read = 1", key).fetchone()
+                if row:
+                    found[index] = row
+                    self.used.add(key)
+        return found
+        
+    def store_capture_time(self, scanned, timestamp, kind):
+        key = cache_key(scanned)
+        with self.lock:
+            self._ensure(key)
+            self.conn.execute("UPDATE sources SET metadata_read = 1, capture_ts = ?, media_type = ? "
+                              "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND path = ?",
+                              (timestamp, kind) + key)
+            self._changed()
+        
+    def get_hash(self, key, column):
+        with self.lock:
+            row = self.conn.execute(f"SELECT {column} FROM sources "
+                                    "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND path = ?", key).fetchone()
+            if row and row[0]:
+                self.used.add(key)
+                return row[0]
+        return None
+        
+    def store_hash(self, key, column, value):
+        with self.lock:
+            self._ensure(key)
+            self.conn.execute(f"UPDATE sources SET {column} = ? "
+                              "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND path = ?",
+                              (value,) + key)
+            self._changed()
+        
+    def _ensure(self, key):
+        self.conn.execute("INSERT OR IGNORE INTO sources (device, inode, size, mtime_ns, path, last_used) "
+                          "VALUES (?, ?, ?, ?, ?, ?)", key + (self.now,))
+                          
+    def _changed(self):
+        self.uncommitted += 1
+        if self.uncommitted >= CACHE_COMMIT_INTERVAL:
+            self.conn.commit()
+            self.uncommitted = 0
+            
+    def close(self):
+        """Mark this run's hits as used, evict the oldest entries past the limit and commit"""
+        self.conn.executemany("UPDATE sources SET last_used = ? "
+                              "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ? AND path = ?",
+                              [(self.now,) + key for key in self.used])
+        excess = self.conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.conn.execute("DELETE FROM sources WHERE rowid IN "
+                              "(SELECT rowid FROM sources ORDER BY last_used LIMIT ?)", (excess,))
+        self.conn.commit()
+        self.conn.close()
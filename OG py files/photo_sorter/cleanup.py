@@ -0,0 +1,71 @@
+import os
+
+from .transfer import DEFAULT_COPY_WORKERS, CopyEngine
+from .journal import read_journal
+from .engine import SortError
+
+class DeleteReport:
+    """What a delete of verified source files removed and what it left in place"""
+    def __init__(self):
+        self.deleted = []
+        # (source path, reason) for verified files that were kept anyway
+        self.kept = []
+        self.removed_folders = []
+
+def unlink_if_unchanged(path, size, mtime_ns):
+    """Delete a source file unless it changed after it was verified; returns None or the reason it was kept"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        # Nothing left to delete
+        return None
+    if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+        return "changed since it was verified"
+    os.unlink(path)
+    return None
+
+def remove_empty_folders(folders, root):
+    """Remove folders left empty, deepest first, up to and including root; returns those removed"""
+    root = os.path.abspath(root)
+    candidates = set()
+    for folder in folders:
+        folder = os.path.abspath(folder)
+        # Every folder between a deleted file and the root may now be empty
+        while folder == root or folder.startswith(root + os.sep):
+            candidates.add(folder)
+            if folder == root:
+                break
+            folder = os.path.dirname(folder)
+            
+    removed = []
+    for folder in sorted(candidates, key=len, reverse=True):
+        try:
+            os.rmdir(folder)
+            removed.append(folder)
+        except OSError:
+            # Not empty (unverified files stay), or can't be removed, e.g. a mount point
+            pass
+    return removed
+
+def delete_verified(source_path, backup_root, workers=DEFAULT_COPY_WORKERS, on_progress=None):
+    """Delete the source files the manifest records as copied and verified, in parallel"""
+    state = read_journal(backup_root)
+    if state is None or os.path.abspath(state.source_path) != os.path.abspath(source_path):
+        raise SortError("The backup has no record of sorting this folder.")
+        
+    report = DeleteReport()
+    total_files = len(state.verified)
+    tasks = ((path, unlink_if_unchanged, (path, size, mtime_ns)) for path, (size, mtime_ns) in state.verified.items())
+    for path, reason, error in CopyEngine(workers).run(tasks):
+        if error:
+            reason = str(error)
+        if reason:
+            report.kept.append((path, reason))
+        else:
+            report.deleted.append(path)
+        if on_progress:
+            done = len(report.deleted) + len(report.kept)
+            on_progress(done / max(1, total_files) * 100, f"Deleted {len(report.deleted)}/{total_files}")
+            
+    report.removed_folders = remove_empty_folders({os.path.dirname(path) for path in report.deleted}, state.source_path)
+    return report
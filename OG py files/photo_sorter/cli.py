@@ -0,0 +1,173 @@
+import sys
+import json
+import signal
+import logging
+import argparse
+
+from .engine import SortJob, SortError, backup_root_for
+from .control import SortCancelled
+from .verify import verify_sources
+from .cleanup import delete_verified
+from .transfer import DEFAULT_COPY_WORKERS, DEFAULT_FSYNC_POLICY, FSYNC_POLICIES, DEFAULT_VERIFY_MODE, VERIFY_MODES
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="apple-pic-sorter",
+        description="Sort iPhone DCIM folders into year folders. Run without arguments for the GUI.")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+    
+    sort_parser = commands.add_parser("sort", help="sort SRC into DST/Iphone_Photo_Backup")
+    sort_parser.add_argument("source", metavar="SRC", help="folder containing the DCIM subfolders")
+    sort_parser.add_argument("destination", metavar="DST", help="folder to create or update Iphone_Photo_Backup in")
+    sort_parser.add_argument("--workers", type=int, default=DEFAULT_COPY_WORKERS,
+                             help=f"number of files copied at the same time (default {DEFAULT_COPY_WORKERS})")
+    sort_parser.add_argument("--move", action="store_true",
+                             help="move files instead of copying them")
+    sort_parser.add_argument("--folder-dates", action="store_true",
+                             help="take each file's year from its folder name instead of its capture date")
+    sort_parser.add_argument("--fsync", choices=FSYNC_POLICIES, default=DEFAULT_FSYNC_POLICY,
+                             help="flush copies to disk never, after each file, or in batches "
+                                  f"(default {DEFAULT_FSYNC_POLICY})")
+    sort_parser.add_argument("--verify", choices=VERIFY_MODES, default=DEFAULT_VERIFY_MODE,
+                             help="hash copies as they are written, and optionally read them back to compare; "
+                                  "hashing uses a buffered copy, several times slower than the kernel copy "
+                                  f"'none' allows on the same drive (default {DEFAULT_VERIFY_MODE})")
+    sort_parser.add_argument("--resume", action="store_true",
+                             help="skip files an interrupted run of the same sort already finished")
+    sort_parser.add_argument("--json", action="store_true",
+                             help="print a JSON summary on stdout; messages go to stderr")
+    
+    verify_parser = commands.add_parser("verify", help="check SRC's files against the last sort into DST")
+    verify_parser.add_argument("source", metavar="SRC", help="folder that was sorted")
+    verify_parser.add_argument("destination", metavar="DST", help="folder containing Iphone_Photo_Backup")
+    verify_parser.add_argument("--workers", type=int, default=DEFAULT_COPY_WORKERS,
+                               help=f"number of files checked at the same time (default {DEFAULT_COPY_WORKERS})")
+    verify_parser.add_argument("--json", action="store_true",
+                               help="print a JSON report on stdout")
+    
+    delete_parser = commands.add_parser("delete", help="verify SRC against DST, then delete only the verified files")
+    delete_parser.add_argument("source", metavar="SRC", help="folder that was sorted")
+    delete_parser.add_argument("destination", metavar="DST", help="folder containing Iphone_Photo_Backup")
+    delete_parser.add_argument("--workers", type=int, default=DEFAULT_COPY_WORKERS,
+                               help=f"number of files handled at the same time (default {DEFAULT_COPY_WORKERS})")
+    delete_parser.add_argument("--yes", action="store_true",
+                               help="don't ask for confirmation")
+    return parser
+
+def describe_error(error):
+    """Message for an error that stopped a command; unexpected ones also name their type"""
+    if isinstance(error, (SortError, OSError)):
+        return str(error)
+    return f"{type(error).__name__}: {error}"
+
+def run_sort(args):
+    """Run a sort from parsed arguments and return the exit code"""
+    def show_message(message, level):
+        # With --json, stdout only carries the summary
+        if args.json and level < logging.WARNING:
+            return
+        print(message, file=sys.stderr if args.json or level >= logging.WARNING else sys.stdout, flush=True)
+        
+    job = SortJob(args.source, backup_root_for(args.destination), workers=args.workers,
+                  move=args.move, use_metadata=not args.folder_dates,
+                  resume=args.resume, fsync_policy=args.fsync,
+                  verify=args.verify, on_message=show_message)
+    
+    def stop(signum, frame):
+        # The first Ctrl+C stops cleanly; a second one interrupts at once
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        print("Stopping after the files in progress; press Ctrl+C again to quit now", file=sys.stderr, flush=True)
+        job.control.cancel()
+        
+    previous_handler = signal.signal(signal.SIGINT, stop)
+    try:
+        job.run()
+    except SortCancelled:
+        print("Sort cancelled; run it again with --resume to continue", file=sys.stderr)
+        if args.json:
+            summary = job.summary()
+            summary['status'] = 'cancelled'
+            print(json.dumps(summary, indent=2))
+        return 130
+    except Exception as e:
+        # Anything unexpected, e.g. a locked index, is still reported rather than left as a traceback
+        print(f"Error: {describe_error(e)}", file=sys.stderr)
+        if args.json:
+            print(json.dumps({'status': 'error', 'error': describe_error(e)}))
+        return 1
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        
+    if args.json:
+        summary = job.summary()
+        summary['status'] = 'failed' if job.stats['failed_files'] else 'ok'
+        print(json.dumps(summary, indent=2))
+    return 1 if job.stats['failed_files'] else 0
+
+def run_verify(args):
+    """Verify a sorted source from parsed arguments and return the exit code"""
+    try:
+        report = verify_sources(args.source, backup_root_for(args.destination), workers=args.workers)
+    except Exception as e:
+        print(f"Error: {describe_error(e)}", file=sys.stderr)
+        if args.json:
+            print(json.dumps({'status': 'error', 'error': describe_error(e)}))
+        return 1
+        
+    ok = not report.problems and not report.unrecorded
+    if args.json:
+        print(json.dumps({
+            'status': 'ok' if ok else 'failed',
+            'total_files': report.total_files,
+            'verified_files': len(report.verified),
+            'problems': [{'path': path, 'reason': reason} for path, reason in report.problems],
+            'unrecorded': report.unrecorded
+        }, indent=2))
+    else:
+        for path, reason in report.problems:
+            print(f"Not verified: {path}: {reason}", file=sys.stderr)
+        for path in report.unrecorded:
+            print(f"Not in the backup: {path}", file=sys.stderr)
+        print(f"Verified {len(report.verified):,} of {report.total_files:,} source files")
+    return 0 if ok else 1
+    
+def run_delete(args):
+    """Verify a sorted source, then delete its verified files; returns the exit code"""
+    backup_root = backup_root_for(args.destination)
+    try:
+        report = verify_sources(args.source, backup_root, workers=args.workers)
+    except Exception as e:
+        print(f"Error: {describe_error(e)}", file=sys.stderr)
+        return 1
+        
+    unverified = len(report.problems) + len(report.unrecorded)
+    print(f"Verified {len(report.verified):,} of {report.total_files:,} source files; "
+          f"{unverified:,} will be kept")
+    if not report.verified:
+        return 1
+    if not args.yes:
+        answer = input(f"Delete {len(report.verified):,} verified files from {args.source}? [y/N] ")
+        if answer.strip().lower() not in ("y", "yes"):
+            return 1
+            
+    try:
+        result = delete_verified(args.source, backup_root, workers=args.workers)
+    except Exception as e:
+        print(f"Error: {describe_error(e)}", file=sys.stderr)
+        return 1
+    for path, reason in result.kept:
+        print(f"Kept {path}: {reason}", file=sys.stderr)
+    print(f"Deleted {len(result.deleted):,} files and {len(result.removed_folders):,} empty folders")
+    return 0 if not result.kept and not unverified else 1
+    
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.workers < 1:
+        print("Error: --workers must be at least 1", file=sys.stderr)
+        return 2
+    if args.command == "verify":
+        return run_verify(args)
+    if args.command == "delete":
+        return run_delete(args)
+    return run_sort(args)
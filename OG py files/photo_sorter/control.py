@@ -0,0 +1,42 @@
+import threading
+
+class SortCancelled(Exception):
+    """A job was cancelled; what it finished stays in its journal for a resume"""
+
+class JobControl:
+    """Cooperative pause and cancel for a running job, checked between files and between chunks of a file"""
+    def __init__(self):
+        # Set while the job may run; cleared to pause it
+        self.running = threading.Event()
+        self.running.set()
+        self.cancel_requested = threading.Event()
+        
+    @property
+    def paused(self):
+        return not self.running.is_set()
+        
+    @property
+    def cancelled(self):
+        return self.cancel_requested.is_set()
+        
+    def pause(self):
+        if not self.cancelled:
+            self.running.clear()
+            
+    def resume(self):
+        self.running.set()
+        
+    def cancel(self):
+        self.cancel_requested.set()
+        # Wake anything waiting out a pause so it can stop
+        self.running.set()
+        
+    def proceed(self):
+        """Wait out a pause; False once the job is cancelled"""
+        self.running.wait()
+        return not self.cancelled
+        
+    def checkpoint(self):
+        """Wait out a pause, raising SortCancelled once the job is cancelled, e.g. part way through a file"""
+        if not self.proceed():
+            raise SortCancelled("The sort was cancelled")
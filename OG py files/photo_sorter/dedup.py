@@ -0,0 +1,305 @@
+import os
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import defaultdict
+
+# Bytes read from each end of a file for the quick duplicate check
+PARTIAL_HASH_SIZE = 64 * 1024
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Content index kept at the backup root, and how often it commits
+INDEX_FILE_NAME = ".photo_sorter_index.sqlite3"
+INDEX_COMMIT_INTERVAL = 500
+
+# Files looked up in the index at the same time by the duplicate stage, and
+# the lookups it has queued or running before it stops taking new files
+DEDUP_WORKERS = 4
+DEDUP_MAX_PENDING = 1024
+# Buckets of file sizes for telling whether a copy of some size landed since a lookup
+SETTLED_SIZE_BUCKETS = 65536
+
+def partial_hash(path, size, checkpoint=None):
+    """Hash a file's size with its first and last 64 KiB"""
+    if checkpoint:
+        checkpoint()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(size.to_bytes(8, 'little'))
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_HASH_SIZE))
+        if size > PARTIAL_HASH_SIZE:
+            f.seek(max(PARTIAL_HASH_SIZE, size - PARTIAL_HASH_SIZE))
+            digest.update(f.read(PARTIAL_HASH_SIZE))
+    return digest.hexdigest()
+
+def full_hash(path, checkpoint=None):
+    """Hash a whole file, streaming it in chunks; checkpoint() runs between chunks and may raise to stop"""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        while True:
+            if checkpoint:
+                checkpoint()
+            chunk = f.read(HASH_BUFFER_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class HashIndex:
+    """SQLite index of the backup's files: relative path, size, mtime and hashes"""
+    def __init__(self, backup_root):
+        self.backup_root = backup_root
+        self.path = os.path.join(backup_root, INDEX_FILE_NAME)
+        # Shared by the duplicate stage's workers and the copy stage, one at a time
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                rel_path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                partial_hash TEXT,
+                full_hash TEXT
+            );
+            CREATE INDEX IF NOT EXISTS files_by_size_hash ON files (size, partial_hash);
+            CREATE TABLE IF NOT EXISTS folders (
+                rel_path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL
+            );
+        """)
+        self.synced_folders = []
+        self.uncommitted = 0
+        
+    def relative(self, path):
+        """Index key for a backup path, with forward slashes on every platform"""
+        return os.path.relpath(path, self.backup_root).replace(os.sep, '/')
+        
+    def absolute(self, rel_path):
+        return os.path.join(self.backup_root, *rel_path.split('/'))
+        
+    def sync_folder(self, listing):
+        """Bring the index in line with a folder listing, unless the folder is unchanged since the last run"""
+        with self.lock:
+            folder_path = listing.folder_path
+            self.synced_folders.append(folder_path)
+            rel_folder = self.relative(folder_path)
+            folder_mtime = os.stat(folder_path).st_mtime_ns
+            row = self.conn.execute("SELECT mtime_ns FROM folders WHERE rel_path = ?", (rel_folder,)).fetchone()
+            if row and row[0] == folder_mtime:
+                return False
+                
+            # Rows under rel_folder/ sort between "rel_folder/" and "rel_folder0"
+            known = {rel: (size, mtime) for rel, size, mtime in self.conn.execute(
+                "SELECT rel_path, size, mtime_ns FROM files WHERE rel_path >= ? AND rel_path < ?",
+                (rel_folder + '/', rel_folder + '0'))}
+            seen = set()
+            for name, size, mtime_ns in listing.files():
+                rel_path = f"{rel_folder}/{name}"
+                seen.add(rel_path)
+                if known.get(rel_path) != (size, mtime_ns):
+                    self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, NULL, NULL)",
+                                      (rel_path, size, mtime_ns))
+            self.conn.executemany("DELETE FROM files WHERE rel_path = ?", [(rel,) for rel in known if rel not in seen])
+            self.conn.commit()
+            return True
+            
+    def has_size(self, size):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM files WHERE size = ? LIMIT 1", (size,)).fetchone() is not None
+            
+    def candidates(self, size, partial):
+        """Indexed files of a given size whose partial hash matches or isn't known yet, as (path, partial hash, full hash)"""
+        with self.lock:
+            # Filtering here keeps lookups cheap when many backup files share a size
+            rows = self.conn.execute("SELECT rel_path, partial_hash, full_hash FROM files WHERE size = ? AND partial_hash = ? "
+                                     "UNION ALL "
+                                     "SELECT rel_path, partial_hash, full_hash FROM files WHERE size = ? AND partial_hash IS NULL",
+                                     (size, partial, size))
+            return [(self.absolute(rel), known_partial, full) for rel, known_partial, full in rows]
+            
+    def add(self, path, size, mtime_ns, partial=None, full=None):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                              (self.relative(path), size, mtime_ns, partial, full))
+            self._changed()
+            
+    def set_hash(self, path, column, value):
+        with self.lock:
+            self.conn.execute(f"UPDATE files SET {column} = ? WHERE rel_path = ?", (value, self.relative(path)))
+            self._changed()
+            
+    def remove(self, path):
+        with self.lock:
+            self.conn.execute("DELETE FROM files WHERE rel_path = ?", (self.relative(path),))
+            self._changed()
+            
+    def confirm(self, path, current):
+        """Check an indexed file still has its indexed (size, mtime), dropping its hashes if not"""
+        if current is None:
+            self.remove(path)
+            return False
+        with self.lock:
+            row = self.conn.execute("SELECT size, mtime_ns FROM files WHERE rel_path = ?", (self.relative(path),)).fetchone()
+        if row and row == current:
+            return True
+        self.add(path, *current)
+        return False
+            
+    def _changed(self):
+        self.uncommitted += 1
+        if self.uncommitted >= INDEX_COMMIT_INTERVAL:
+            self.conn.commit()
+            self.uncommitted = 0
+            
+    def close(self):
+        """Commit, remembering folder mtimes so unchanged folders aren't listed next run"""
+        with self.lock:
+            for folder_path in self.synced_folders:
+                self.conn.execute("INSERT OR REPLACE INTO folders VALUES (?, ?)",
+                                  (self.relative(folder_path), os.stat(folder_path).st_mtime_ns))
+            self.conn.commit()
+            self.conn.close()
+
+class DuplicateFinder:
+    """Find files already in the backup by size, then partial hash, then full hash"""
+    def __init__(self, index, listings, source_cache=None, checkpoint=None):
+        self.index = index
+        # Called between chunks of every hash, to wait out a pause or stop on a cancel
+        self.checkpoint = checkpoint
+        # Hashes of unchanged source files from earlier runs
+        self.source_cache = source_cache
+        # folder path -> FolderListing, to check indexed files without touching the disk
+        self.listings = listings
+        # size -> {backup path: source}, for copies still in flight
+        self.in_flight = defaultdict(dict)
+        self.in_flight_hashes = {}
+        # Copies settled so far, and that count as of the last settle in each size bucket;
+        # a lookup that read settles beforehand may have missed only copies stamped later
+        self.settles = 0
+        self.settled_at = array('Q', bytes(8 * SETTLED_SIZE_BUCKETS))
+        
+    def add(self, path, size, source, partial=None, full=None):
+        """Register a copy in flight with any source hashes already taken; its source is read instead until it lands"""
+        self.in_flight[size][path] = source
+        hashes = {column: value for column, value in (('partial_hash', partial), ('full_hash', full)) if value}
+        if hashes:
+            self.in_flight_hashes[path] = hashes
+            
+    def settle(self, path, size, mtime_ns, full=None):
+        """The copy to path finished, so move it into the index; full is a hash taken while copying"""
+        self._forget(path, size)
+        hashes = self.in_flight_hashes.pop(path, {})
+        self.index.add(path, size, mtime_ns, hashes.get('partial_hash'), full or hashes.get('full_hash'))
+        self.settles += 1
+        self.settled_at[size % SETTLED_SIZE_BUCKETS] = self.settles
+        
+    def remove(self, path, size):
+        """Forget a copy in flight, e.g. because it failed"""
+        self._forget(path, size)
+        self.in_flight_hashes.pop(path, None)
+        
+    def _forget(self, path, size):
+        copies = self.in_flight.get(size)
+        if copies is not None:
+            copies.pop(path, None)
+            # Sizes with nothing in flight are dropped, so memory stays flat over a long run
+            if not copies:
+                del self.in_flight[size]
+                
+                
+    def find_indexed(self, path, size, key=None, partial=None, full=None):
+        """Look for path's content among the indexed backup files; returns (backup path or None, partial hash, full hash)"""
+        # Safe to run on several threads at once; copies in flight are left to find_recent
+        if not self.index.has_size(size):
+            return None, partial, full
+            
+        # Only same-size files get read at all, and only their ends at first
+        if partial is None:
+            partial = self._source_hash(path, key, 'partial_hash', lambda p: partial_hash(p, size, self.checkpoint))
+        candidates = [(candidate_path, known_partial, known_full, None)
+                      for candidate_path, known_partial, known_full in self.index.candidates(size, partial)]
+        return self._first_match(path, size, key, candidates, partial, full)
+        
+    def find_recent(self, path, size, since, partial=None, full=None, key=None):
+        """Look for path's content among this run's copies that find_indexed, run when settles was since, could not see"""
+        # Runs on the thread that registers and settles the copies, reusing the hashes find_indexed took
+        if self.settled_at[size % SETTLED_SIZE_BUCKETS] > since:
+            duplicate, partial, full = self.find_indexed(path, size, key, partial, full)
+            if duplicate:
+                return duplicate, partial, full
+        in_flight = self.in_flight.get(size)
+        if not in_flight:
+            return None, partial, full
+        if partial is None:
+            partial = self._source_hash(path, key, 'partial_hash', lambda p: partial_hash(p, size, self.checkpoint))
+        candidates = []
+        for dst, source in in_flight.items():
+            hashes = self.in_flight_hashes.get(dst, {})
+            candidates.append((dst, hashes.get('partial_hash'), hashes.get('full_hash'), source))
+        return self._first_match(path, size, key, candidates, partial, full)
+        
+    def _first_match(self, path, size, key, candidates, wanted_partial, wanted_full=None):
+        """First (path, partial hash, full hash, source) candidate with path's content, as (match, partial, full)"""
+        for candidate_path, partial, full, source in candidates:
+            if partial is None:
+                partial = self._hash(candidate_path, source, 'partial_hash', lambda p: partial_hash(p, size, self.checkpoint))
+            if partial != wanted_partial:
+                continue
+                
+            # The partial hash covers small files completely
+            if size > 2 * PARTIAL_HASH_SIZE:
+                if wanted_full is None:
+                    wanted_full = self._source_hash(path, key, 'full_hash', self._full_hash)
+                if full is None:
+                    full = self._hash(candidate_path, source, 'full_hash', self._full_hash)
+                if full != wanted_full:
+                    continue
+                    
+            # Indexed hashes are only trusted if the file is unchanged
+            if source is None and not self.index.confirm(candidate_path, self._current_stat(candidate_path)):
+                continue
+            return candidate_path, wanted_partial, wanted_full
+        return None, wanted_partial, wanted_full
+        
+    def _full_hash(self, path):
+        return full_hash(path, self.checkpoint)
+        
+    def _source_hash(self, path, key, column, hash_func):
+        """Hash the file being looked up, unless the cache has it from an earlier run"""
+        if self.source_cache is None or key is None:
+            return hash_func(path)
+        value = self.source_cache.get_hash(key, column)
+        if value is None:
+            value = hash_func(path)
+            self.source_cache.store_hash(key, column, value)
+        return value
+        
+    def _current_stat(self, path):
+        folder_path, name = os.path.split(path)
+        listing = self.listings.get(folder_path)
+        if listing is None:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                return None
+            return st.st_size, st.st_mtime_ns
+        return listing.stat(name)
+        
+    def _hash(self, candidate_path, source, column, hash_func):
+        """Hash a candidate and remember it, or None if it can't be read"""
+        # While a copy is in flight its source has the same content and is complete
+        for read_path in filter(None, (source, candidate_path)):
+            try:
+                value = hash_func(read_path)
+            except OSError:
+                continue
+            if source:
+                self.in_flight_hashes.setdefault(candidate_path, {})[column] = value
+            else:
+                self.index.set_hash(candidate_path, column, value)
+            return value
+        if not source:
+            self.index.remove(candidate_path)
+        return None
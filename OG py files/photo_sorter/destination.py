@@ -0,0 +1,83 @@
+import os
+import re
+from collections import Counter
+
+from .transfer import is_temp_name
+
+# Names like IMG_0001_3.JPG, as created for name collisions
+SUFFIX_PATTERN = re.compile(r'^(.*)_(\d+)$')
+
+class FolderListing:
+    """Cached listing of a backup folder, with the next free collision suffix for each name"""
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        # name -> (size, mtime_ns), both None for folders and for names claimed
+        # by copies still in flight. Names are kept exactly as listed, since
+        # IMG_1.JPG and img_1.jpg are different files on case-sensitive filesystems
+        self.entries = {}
+        # Casefolded names in use; new names avoid these so they are also unique
+        # on case-insensitive filesystems such as Windows and macOS
+        self.taken = Counter()
+        self.next_suffix = {}
+        # Temporary files left by an interrupted copy, for the caller to remove
+        self.stale_temp_files = []
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if is_temp_name(entry.name):
+                    self.stale_temp_files.append(entry.path)
+                elif entry.is_file():
+                    st = entry.stat()
+                    self.add(entry.name, st.st_size, st.st_mtime_ns)
+                else:
+                    self.add(entry.name)
+                    
+    def add(self, name, size=None, mtime_ns=None):
+        if name not in self.entries:
+            self.taken[name.casefold()] += 1
+        self.entries[name] = (size, mtime_ns)
+        base, ext = os.path.splitext(name)
+        match = SUFFIX_PATTERN.match(base)
+        if match:
+            key = (match.group(1) + ext).casefold()
+            counter = int(match.group(2))
+            if counter >= self.next_suffix.get(key, 1):
+                self.next_suffix[key] = counter + 1
+                
+    def stat(self, name):
+        """(size, mtime_ns) of a file in the folder, or None"""
+        entry = self.entries.get(name)
+        if entry is None or entry[0] is None:
+            return None
+        return entry
+        
+    def files(self):
+        """Iterate (name, size, mtime_ns) for the files in the folder"""
+        return ((name, size, mtime_ns) for name, (size, mtime_ns) in self.entries.items() if size is not None)
+        
+    def record(self, name, size, mtime_ns):
+        """Update the listing after writing a file"""
+        self.add(name, size, mtime_ns)
+        
+    def release(self, name):
+        """Free a claimed name whose copy failed"""
+        if self.entries.pop(name, None) is not None:
+            folded = name.casefold()
+            self.taken[folded] -= 1
+            if self.taken[folded] <= 0:
+                del self.taken[folded]
+                
+    def claim(self, filename):
+        """Reserve a unique name, adding _1, _2, ... when filename is taken"""
+        if filename.casefold() not in self.taken:
+            self.add(filename)
+            return filename
+            
+        base, ext = os.path.splitext(filename)
+        counter = self.next_suffix.get(filename.casefold(), 1)
+        new_filename = f"{base}_{counter}{ext}"
+        # Only loops if a suffixed name was created by hand
+        while new_filename.casefold() in self.taken:
+            counter += 1
+            new_filename = f"{base}_{counter}{ext}"
+        self.add(new_filename)
+        return new_filename
@@ -0,0 +1,591 @@
+import os
+import datetime
+import logging
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .scanner import list_subfolders, iter_source_batches, extract_unique_years
+from .transfer import (DEFAULT_COPY_WORKERS, DEFAULT_FSYNC_POLICY, DEFAULT_VERIFY_MODE, CopyEngine, SyncBatch,
+                       copy_one_file, move_one_file, temp_path_for)
+from .dedup import DEDUP_WORKERS, DEDUP_MAX_PENDING, HashIndex, DuplicateFinder
+from .destination import FolderListing
+from .metadata import CaptureTimeReader, timestamp_to_datetime
+from .cache import SourceCache, cache_key
+from .journal import JobJournal, read_journal
+from .pipeline import run_stage
+from .control import JobControl, SortCancelled
+from .progress import ProgressTracker, format_bytes, format_duration
+from .logqueue import BufferedFileHandler, BackgroundQueueHandler
+
+# Folder created inside the chosen destination
+BACKUP_FOLDER_NAME = "Iphone_Photo_Backup"
+
+# What the duplicate stage found out about a file before it is planned
+Lookup = namedtuple('Lookup', ['scanned', 'resumed', 'since', 'duplicate', 'partial_hash', 'full_hash', 'error'])
+
+class SortError(Exception):
+    """A problem with the source or destination that stops a sort before it starts"""
+
+def backup_root_for(dest_path):
+    """Backup folder used for a chosen destination"""
+    return os.path.join(dest_path, BACKUP_FOLDER_NAME)
+
+def new_stats():
+    """Empty statistics for a sort run"""
+    return {
+        'total_files': 0,
+        'copied_files': 0,
+        'copied_bytes': 0,
+        'failed_files': 0,
+        'existing_files': 0,
+        'verified_files': 0,
+        'years_processed': set(),
+        'transfer_methods': Counter()
+    }
+
+class SortJob:
+    """One sort of a source folder into the backup, shared by the GUI and the command line"""
+    def __init__(self, source_path, backup_root, workers=DEFAULT_COPY_WORKERS, move=False,
+                 use_metadata=True, resume=False, fsync_policy=DEFAULT_FSYNC_POLICY,
+                 verify=DEFAULT_VERIFY_MODE, scan=None, control=None, on_message=None, on_progress=None):
+        self.source_path = source_path
+        self.backup_root = backup_root
+        self.workers = workers
+        self.move = move
+        # Sort by the capture date in each file's header, falling back to the folder year
+        self.use_metadata = use_metadata
+        # Skip files an unfinished earlier run of the same job already transferred
+        self.resume = resume
+        # 'none', 'file' (fsync each file) or 'batch' (fsync groups of files)
+        self.fsync_policy = fsync_policy
+        # 'none', 'hash' (hash while copying) or 'reread' (also read each copy back and compare)
+        self.verify = verify
+        # A complete scan from an earlier analysis of the same source is reused by one run
+        self.scan = scan
+        # Pause and cancel, checked by every stage between files
+        self.control = control or JobControl()
+        # Callbacks for the caller's display: on_message(message, level), on_progress(percent, text)
+        self.on_message = on_message
+        self.on_progress = on_progress
+        self.year_listings = {}
+        self.progress = ProgressTracker()
+        self.source_cache = None
+        self.journal = None
+        self.logger = None
+        self.log_file_path = None
+        self.stats = new_stats()
+        
+    def log_message(self, message, level=logging.INFO):
+        """Add message to the log file and pass it on to the display"""
+        if self.logger:
+            self.logger.log(level, message)
+        if self.on_message:
+            self.on_message(message, level)
+            
+    def report_progress(self, value, text):
+        if self.on_progress:
+            self.on_progress(value, text)
+            
+    def publish_progress(self, force=False):
+        """Report byte-weighted progress with throughput and ETA, a few times a second at most"""
+        if self.progress.due() or force:
+            snapshot = self.progress.snapshot()
+            self.report_progress(snapshot['percent'], self.progress.describe(snapshot))
+            
+    def file_done(self, size, transferred=False):
+        """Count a file as dealt with, whether copied, skipped or failed"""
+        self.progress.add_done(1, size, transferred)
+        self.publish_progress()
+        
+    def setup_logging(self):
+        """Setup logging to file in the backup directory"""
+        os.makedirs(self.backup_root, exist_ok=True)
+        
+        # Create log file path
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.log_file_path = os.path.join(self.backup_root, f"photo_sort_log_{timestamp}.log")
+        
+        # Setup logger
+        self.logger = logging.getLogger('PhotoSorter')
+        self.logger.setLevel(logging.INFO)
+        
+        # Clear any existing handlers
+        for handler in list(self.logger.handlers):
+            handler.close()
+        self.logger.handlers.clear()
+        
+        # File handler, written to from a background thread so the copy never waits on the log
+        file_handler = BufferedFileHandler(self.log_file_path, encoding='utf-8')
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler.setFormatter(formatter)
+        self.logger.addHandler(BackgroundQueueHandler(file_handler))
+        
+    def flush_log(self):
+        """Write out the log lines still queued or buffered"""
+        if self.logger:
+            for handler in self.logger.handlers:
+                handler.flush()
+        
+    def log_scan_error(self, path, error):
+        self.log_message(f"Could not scan {path}: {error}", logging.WARNING)
+        
+    def scan_batches(self):
+        """Pipeline stage: source files in batches as they are found, replaying the analysis scan if it matches"""
+        if self.scan is not None and self.scan.complete and self.scan.source_path == self.source_path:
+            for path, error in self.scan.errors:
+                self.log_scan_error(path, error)
+            batches = self.scan.files.batches()
+        else:
+            batches = iter_source_batches(self.source_path, on_error=self.log_scan_error)
+            
+        for batch in batches:
+            # A cancelled scan just ends; the copy stage reports the cancel
+            if not self.control.proceed():
+                return
+            self.stats['total_files'] += len(batch)
+            self.progress.add_planned(len(batch), sum(scanned.size for scanned in batch))
+            yield batch
+        self.progress.total_known = True
+        self.log_message(f"Found {self.stats['total_files']:,} files to process")
+        
+    def classify_batches(self, batches):
+        """Pipeline stage: year for each file from its capture date, keeping the folder year when there is none"""
+        if not self.use_metadata:
+            yield from batches
+            return
+            
+        counts = Counter()
+        
+        def dated(scanned, timestamp):
+            counts['files'] += 1
+            if timestamp is None:
+                return scanned
+            counts['dated'] += 1
+            return scanned._replace(year=f"{timestamp_to_datetime(timestamp).year:04d}")
+            
+        def apply(files, results, errors):
+            assigned = list(files)
+            for position, timestamp, kind in results:
+                assigned[position] = dated(files[position], timestamp)
+                self.source_cache.store_capture_time(files[position], timestamp, kind)
+            for position, error in errors:
+                counts['files'] += 1
+                self.log_message(f"Could not read capture date of {files[position].path}: {error}", logging.WARNING)
+            return assigned
+            
+        # Header parsing is CPU-bound, so long runs spread it across processes
+        reader = CaptureTimeReader()
+        try:
+            for batch in batches:
+                if not self.control.proceed():
+                    return
+                # Unchanged files keep the dates parsed on an earlier run
+                cached = self.source_cache.capture_times(batch)
+                if cached:
+                    counts['cached'] += len(cached)
+                    yield [dated(batch[index], timestamp) for index, (timestamp, kind) in sorted(cached.items())]
+                to_read = [scanned for index, scanned in enumerate(batch) if index not in cached]
+                for files, results, errors in reader.add([scanned.path for scanned in to_read], to_read):
+                    yield apply(files, results, errors)
+            for files, results, errors in reader.finish():
+                yield apply(files, results, errors)
+        finally:
+            reader.close()
+            
+        self.log_message(f"Capture dates read from {counts['dated']:,} of {counts['files']:,} files "
+                         f"({counts['cached']:,} from cache); the rest use their folder year")
+        
+    def open_year_folder(self, year):
+        """Create or use an existing year folder, listing it once"""
+        year_path = os.path.join(self.backup_root, year)
+        os.makedirs(year_path, exist_ok=True)
+        # Names, sizes and mtimes are then answered from memory
+        listing = FolderListing(year_path)
+        self.year_listings[year] = listing
+        for temp_file in listing.stale_temp_files:
+            try:
+                os.unlink(temp_file)
+                self.log_message(f"Removed unfinished copy {temp_file}", logging.WARNING)
+            except OSError as e:
+                self.log_message(f"Could not remove {temp_file}: {e}", logging.WARNING)
+        return listing
+        
+    def existing_year_folders(self):
+        """Year folders already in the backup, which may hold duplicates of any source file"""
+        with os.scandir(self.backup_root) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir() and
+                          (entry.name == "Unknown" or (len(entry.name) == 4 and entry.name.isdigit())))
+                          
+    def recover_previous_run(self):
+        """Clean up after a run that stopped part way; return its journal if this run resumes it"""
+        state = read_journal(self.backup_root)
+        if state is None:
+            return None
+            
+        # Running this again is harmless, so nothing is written back to the journal
+        for dst_file, src_file in state.pending.items():
+            # Only the temporary file can be partial; a file gets its final name once all its data is written
+            try:
+                os.unlink(temp_path_for(dst_file))
+            except FileNotFoundError:
+                pass
+            if not os.path.exists(src_file):
+                # Moved, or its drive is gone, so the copy may be the only one left
+                if os.path.exists(dst_file):
+                    # The transfer finished but wasn't recorded
+                    state.committed[src_file] = (dst_file,) + state.planned[dst_file][1:]
+                continue
+            # The source still has the data, so a copy that may not be on disk yet can go
+            try:
+                os.unlink(dst_file)
+                self.log_message(f"Removed unfinished copy {dst_file}", logging.WARNING)
+            except FileNotFoundError:
+                pass
+                
+        if self.resume and state.can_resume(self.source_path, 'move' if self.move else 'copy'):
+            return state
+        return None
+        
+    def discard_partial(self, src_file, dst_file):
+        """Remove what a failed transfer wrote, as long as the source still has the data"""
+        if not os.path.exists(src_file):
+            return False
+        try:
+            os.unlink(dst_file)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        return True
+        
+    def find_duplicates(self, batches, finder, resumed):
+        """Pipeline stage: look each file up in the backup's content index, hashing several files at a time"""
+        def lookup(scanned):
+            # Queued lookups wait out a pause here, and hashes already running wait between chunks
+            if not self.control.proceed():
+                return Lookup(scanned, False, 0, None, None, None, SortCancelled("The sort was cancelled"))
+            # Files the interrupted run already took care of need no hashing
+            if scanned.path in resumed and resumed[scanned.path][1:] == (scanned.size, scanned.mtime_ns):
+                return Lookup(scanned, True, 0, None, None, None, None)
+            # Copies that land after this point are caught again when the file is planned
+            since = finder.settles
+            try:
+                duplicate, partial, full = finder.find_indexed(scanned.path, scanned.size, key=cache_key(scanned))
+            except Exception as e:
+                return Lookup(scanned, False, since, None, None, None, e)
+            return Lookup(scanned, False, since, duplicate, partial, full, None)
+            
+        pending = set()
+        with ThreadPoolExecutor(max_workers=DEDUP_WORKERS) as pool:
+            try:
+                for batch in batches:
+                    # Nothing more is queued while paused
+                    if not self.control.proceed():
+                        return
+                    pending.update(pool.submit(lookup, scanned) for scanned in batch)
+                    # Hand on each lookup as it finishes, so a slow one holds up only its own file
+                    done, pending = wait(pending, timeout=0)
+                    while len(pending) >= DEDUP_MAX_PENDING:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        done |= finished
+                    if done:
+                        yield [future.result() for future in done]
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield [future.result() for future in done]
+            finally:
+                # Lookups not started yet are dropped when the pipeline stops early
+                for future in pending:
+                    future.cancel()
+                    
+    def copy_files_with_progress(self, batches, resumed=None):
+        """Pipeline stage: dedup and copy (or move) files on a pool of workers with progress tracking"""
+        move = self.move
+        journal = self.journal
+        # With batched fsync, transfers are only journaled as done once their batch is on disk
+        sync_batch = SyncBatch() if self.fsync_policy == 'batch' else None
+        # Hashes of copies waiting for their batch, for the journal
+        unsynced_hashes = {}
+        # Files the interrupted run already took care of, by source path
+        resumed = resumed or {}
+        # Content already in the backup, including files copied earlier in this run
+        index = HashIndex(self.backup_root)
+        finder = DuplicateFinder(index, {}, source_cache=self.source_cache, checkpoint=self.control.checkpoint)
+        # Devices of the year folders, to know when a move can be a plain rename
+        year_devices = {}
+        
+        def year_folder(year):
+            """Listing of a year folder, opened the first time a file needs it"""
+            listing = self.year_listings.get(year)
+            if listing is None:
+                listing = self.open_year_folder(year)
+                index.sync_folder(listing)
+                finder.listings[listing.folder_path] = listing
+                if move:
+                    year_devices[year] = os.stat(listing.folder_path).st_dev
+            return listing
+            
+        def plan_copies(lookups):
+            for batch in lookups:
+                for scanned, already_done, since, duplicate, partial, full, error in batch:
+                    # Once cancelled, plan nothing more; transfers in flight stop at their next chunk
+                    if not self.control.proceed():
+                        return
+                    src_file, year = scanned.path, scanned.year
+                    try:
+                        if already_done:
+                            self.stats['existing_files'] += 1
+                            self.file_done(scanned.size)
+                            continue
+                        if error:
+                            raise error
+                            
+                        # Skip files whose content is already in the backup, under any name; the
+                        # duplicate stage checked the index, which leaves this run's latest copies
+                        if not duplicate:
+                            duplicate, partial, full = finder.find_recent(src_file, scanned.size, since, partial, full,
+                                                                          key=cache_key(scanned))
+                        if duplicate:
+                            self.stats['existing_files'] += 1
+                            journal.duplicate(src_file, duplicate, scanned.size, scanned.mtime_ns)
+                            if self.logger:
+                                self.logger.info(f"Skipped {src_file}: same content as {duplicate}")
+                            self.file_done(scanned.size)
+                            continue
+                            
+                        # Only now is the year folder needed, so skipped files never create one
+                        listing = year_folder(year)
+                        # Claim the name, or a unique one if a different file has it; claimed
+                        # names also keep parallel copies from picking the same destination
+                        filename = listing.claim(os.path.basename(src_file))
+                        dst_file = os.path.join(listing.folder_path, filename)
+                        finder.add(dst_file, scanned.size, src_file, partial, full)
+                        journal.plan(src_file, dst_file, scanned.size, scanned.mtime_ns)
+                        if move:
+                            # Windows scans report device 0, so let the rename itself decide there
+                            same_device = scanned.device in (0, year_devices[year])
+                            # The original is deleted, so a copy to another device is flushed first unless fsync is off
+                            yield ((scanned, dst_file), move_one_file,
+                                   (src_file, dst_file, same_device, self.fsync_policy != 'none', self.verify,
+                                    self.control.checkpoint))
+                        else:
+                            yield ((scanned, dst_file), copy_one_file,
+                                   (src_file, dst_file, self.fsync_policy == 'file', self.verify,
+                                    self.control.checkpoint))
+                            
+                    except SortCancelled:
+                        # Stopped part way through hashing; the file is left for a resume
+                        return
+                    except Exception as e:
+                        error_msg = f"Error copying {src_file}: {str(e)}"
+                        self.log_message(error_msg, logging.ERROR)
+                        self.stats['failed_files'] += 1
+                        self.file_done(scanned.size)
+                        
+        lookups = None
+        try:
+            # Duplicates are looked for across the whole backup, not just the years seen so far,
+            # so the index is brought up to date before the duplicate stage starts reading it
+            for year in self.existing_year_folders():
+                year_folder(year)
+                
+            # Hashing for duplicates runs ahead on its own threads, so a large same-size
+            # match holds up neither the planning of other files nor the copy workers
+            lookups = run_stage(self.find_duplicates(batches, finder, resumed), 'duplicates')
+            engine = CopyEngine(self.workers)
+            for (scanned, dst_file), result, error in engine.run(plan_copies(lookups)):
+                if error:
+                    # A transfer stopped by a cancel is rolled back like a failure, but isn't one
+                    if not isinstance(error, SortCancelled):
+                        error_msg = f"Error copying {scanned.path}: {str(error)}"
+                        self.log_message(error_msg, logging.ERROR)
+                        self.stats['failed_files'] += 1
+                    finder.remove(dst_file, scanned.size)
+                    self.year_listings[scanned.year].release(os.path.basename(dst_file))
+                    # If the partial copy can't be removed now, it stays pending for the next run
+                    if self.discard_partial(scanned.path, dst_file):
+                        journal.failed(dst_file)
+                else:
+                    dst_file, method, dst_mtime_ns, content_hash = result
+                    if sync_batch is None:
+                        journal.done(dst_file, content_hash)
+                    else:
+                        unsynced_hashes[dst_file] = content_hash
+                        if sync_batch.add(dst_file, scanned.size):
+                            for synced_file in sync_batch.flush():
+                                journal.done(synced_file, unsynced_hashes.pop(synced_file))
+                    # The hash taken while copying is also the full hash of the source and the copy
+                    finder.settle(dst_file, scanned.size, dst_mtime_ns, content_hash)
+                    if content_hash and self.source_cache:
+                        self.source_cache.store_hash(cache_key(scanned), 'full_hash', content_hash)
+                    if content_hash and self.verify == 'reread':
+                        self.stats['verified_files'] += 1
+                    self.year_listings[scanned.year].record(os.path.basename(dst_file), scanned.size, dst_mtime_ns)
+                    self.stats['copied_files'] += 1
+                    self.stats['copied_bytes'] += scanned.size
+                    self.stats['years_processed'].add(scanned.year)
+                    self.stats['transfer_methods'][method] += 1
+                    if self.logger:
+                        action = "Moved" if move else "Copied"
+                        self.logger.info(f"{action} {scanned.path} -> {dst_file} [{method}]")
+                        
+                # Update progress; a cancelled file is neither done nor failed
+                if not isinstance(error, SortCancelled):
+                    self.file_done(scanned.size, transferred=not error)
+                    
+                if not error and self.stats['copied_files'] % 100 == 1:  # Log every 100 files
+                    self.log_message(f"{'Moved' if move else 'Copied'} {self.progress.describe()}")
+                    
+            if sync_batch is not None and sync_batch.paths:
+                for synced_file in sync_batch.flush():
+                    journal.done(synced_file, unsynced_hashes.pop(synced_file))
+        finally:
+            # Stop the duplicate stage before the index it reads closes
+            if lookups is not None:
+                lookups.close()
+            index.close()
+            
+    def run(self):
+        """Run the whole sort and return the statistics"""
+        if not os.path.isdir(self.source_path):
+            raise SortError("Source folder does not exist.")
+            
+        self.stats = new_stats()
+        verb = 'moved' if self.move else 'copied'
+        
+        # Setup logging
+        self.setup_logging()
+        
+        # Log start
+        self.log_message("=== iPhone Photo Sorting Started ===")
+        self.log_message(f"Source: {self.source_path}")
+        self.log_message(f"Destination: {self.backup_root}")
+        
+        if not self.use_metadata:
+            subfolders = self.scan.subfolders if self.scan is not None else list_subfolders(self.source_path)
+            if not extract_unique_years(subfolders):
+                raise SortError("No valid year-based folders found.")
+            
+        # Finish off an interrupted run; its journal also says what to skip when resuming
+        previous = self.recover_previous_run()
+        resumed = previous.committed if previous else {}
+        if previous:
+            self.log_message(f"Resuming previous run: {len(resumed):,} files already done")
+        self.journal = JobJournal(self.backup_root)
+        self.journal.start(self.source_path, 'move' if self.move else 'copy', resume=previous is not None)
+        
+        # Dates and hashes of source files seen on earlier runs
+        self.source_cache = SourceCache(self.backup_root)
+        self.year_listings = {}
+        self.progress = ProgressTracker()
+        completed = False
+        try:
+            # Scan, date and copy run side by side, each on its own thread(s), with bounded
+            # queues between them; copying starts with the first batch the scan finds
+            self.log_message(f"Starting file {'move' if self.move else 'copy'} process with {self.workers} workers...")
+            scanned = run_stage(self.scan_batches(), 'scan')
+            classified = run_stage(self.classify_batches(scanned), 'capture dates')
+            try:
+                self.copy_files_with_progress(classified, resumed)
+            finally:
+                # Stop the earlier stages before the cache they share closes
+                classified.close()
+                scanned.close()
+            self.log_message(f"Created/verified year folders: {', '.join(sorted(self.year_listings))}")
+            if self.control.cancelled:
+                self.log_message(f"Sort cancelled after {self.stats['copied_files']:,} files were {verb}; "
+                                 f"it can be resumed", logging.WARNING)
+                raise SortCancelled("The sort was cancelled")
+            completed = True
+        finally:
+            self.source_cache.close()
+            self.source_cache = None
+            # An unfinished journal lets the next run resume
+            if completed:
+                self.journal.finish()
+            else:
+                self.journal.close()
+            # The source may change from now on (a move just changed it), so the scan isn't replayed again
+            self.scan = None
+            
+        # Final statistics
+        self.log_message("=== Sorting Complete ===")
+        self.log_message(f"Total files processed: {self.stats['total_files']:,}")
+        self.log_message(f"Files {verb}: {self.stats['copied_files']:,}")
+        self.log_message(f"Files skipped (already exist): {self.stats['existing_files']:,}")
+        self.log_message(f"Failed copies: {self.stats['failed_files']:,}")
+        self.log_message(f"Data {verb}: {self.format_throughput()}")
+        if self.verify == 'reread':
+            self.log_message(f"Copies verified by reading them back: {self.stats['verified_files']:,}")
+        self.log_message(f"Transfer methods: {self.format_transfer_methods()}")
+        self.log_message(f"Years processed: {', '.join(sorted(self.stats['years_processed']))}")
+        
+        # Write summary to log
+        self.write_summary_log()
+        self.flush_log()
+        
+        # Update progress
+        self.publish_progress(force=True)
+        self.report_progress(100, "Complete!")
+        return self.stats
+        
+    def format_transfer_methods(self):
+        """Describe how many files took each transfer path"""
+        methods = self.stats['transfer_methods']
+        if not methods:
+            return "none"
+        return ', '.join(f"{method} {count:,}" for method, count in methods.most_common())
+        
+    def format_throughput(self):
+        """Describe the data transferred, how long the sort took and the average rate"""
+        elapsed = self.progress.snapshot()['elapsed_seconds']
+        rate = self.stats['copied_bytes'] / elapsed if elapsed > 0 else 0
+        return f"{format_bytes(self.stats['copied_bytes'])} in {format_duration(elapsed)} ({format_bytes(rate)}/s)"
+        
+    def summary(self):
+        """Statistics as plain JSON-friendly values"""
+        return {
+            'source': self.source_path,
+            'backup': self.backup_root,
+            'mode': 'move' if self.move else 'copy',
+            'total_files': self.stats['total_files'],
+            'copied_files': self.stats['copied_files'],
+            'copied_bytes': self.stats['copied_bytes'],
+            'existing_files': self.stats['existing_files'],
+            'failed_files': self.stats['failed_files'],
+            'verified_files': self.stats['verified_files'],
+            'years_processed': sorted(self.stats['years_processed']),
+            'transfer_methods': dict(self.stats['transfer_methods']),
+            'elapsed_seconds': round(self.progress.snapshot()['elapsed_seconds'], 3),
+            'log_file': self.log_file_path
+        }
+        
+    def write_summary_log(self):
+        """Write detailed summary to log file"""
+        if not self.logger:
+            return
+            
+        self.logger.info("="*60)
+        self.logger.info("DETAILED SUMMARY")
+        self.logger.info("="*60)
+        self.logger.info(f"Operation completed at: {datetime.datetime.now()}")
+        self.logger.info(f"Source folder: {self.source_path}")
+        self.logger.info(f"Backup folder: {self.backup_root}")
+        self.logger.info(f"Total files found: {self.stats['total_files']:,}")
+        self.logger.info(f"Files successfully copied: {self.stats['copied_files']:,}")
+        self.logger.info(f"Files skipped (duplicates): {self.stats['existing_files']:,}")
+        self.logger.info(f"Failed file copies: {self.stats['failed_files']:,}")
+        self.logger.info(f"Transfer methods: {self.format_transfer_methods()}")
+        self.logger.info(f"Success rate: {(self.stats['copied_files'] / max(1, self.stats['total_files']) * 100):.1f}%")
+        self.logger.info(f"Years processed: {', '.join(sorted(self.stats['years_processed']))}")
+        
+        # Log folder structure
+        self.logger.info("\nFINAL FOLDER STRUCTURE:")
+        try:
+            for year_folder in sorted(os.listdir(self.backup_root)):
+                year_path = os.path.join(self.backup_root, year_folder)
+                if os.path.isdir(year_path) and (year_folder == "Unknown" or (len(year_folder) == 4 and year_folder.isdigit())):
+                    file_count = sum(len(files) for _, _, files in os.walk(year_path))
+                    self.logger.info(f"  {year_folder}/: {file_count:,} files")
+        except Exception as e:
+            self.logger.error(f"Error logging folder structure: {e}")
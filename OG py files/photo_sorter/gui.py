@@ -0,0 +1,657 @@
+import os
+import re
+import datetime
+import logging
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+import threading
+import queue
+from collections import Counter
+
+from .scanner import scan_source, extract_unique_years
+from .transfer import DEFAULT_COPY_WORKERS, DEFAULT_VERIFY_MODE, VERIFY_MODES
+from .engine import SortJob, backup_root_for
+from .control import JobControl, SortCancelled
+from .journal import read_journal
+from .verify import verify_sources
+from .cleanup import delete_verified
+
+# How often the window applies queued updates from the sorting thread (~15 Hz)
+UI_REFRESH_MS = 66
+
+# Lines kept in the status window, and repeats of one kind of warning shown before they are only counted
+STATUS_MAX_LINES = 1000
+STATUS_REPEATS_SHOWN = 3
+
+# Start of a path in a message, and the OS error it reports
+PATH_START = re.compile(r"(?:[A-Za-z]:)?[\\/]")
+OS_ERROR = re.compile(r"\[(?:Errno|WinError) -?\d+\][^:'\"]*")
+
+def message_kind(message):
+    """What repeats of a message share: the words before its first path, and any OS error it reports"""
+    match = PATH_START.search(message)
+    if not match:
+        return message
+    os_error = OS_ERROR.search(message)
+    return message[:match.start()] + (os_error.group(0).strip() if os_error else "")
+
+class StatusConsole:
+    """Status window that keeps only its last lines and folds repeated warnings into a running count"""
+    def __init__(self, text, max_lines=STATUS_MAX_LINES, repeats_shown=STATUS_REPEATS_SHOWN):
+        self.text = text
+        self.max_lines = max_lines
+        self.repeats_shown = repeats_shown
+        # Text tag of each kind's count line
+        self.count_tags = {}
+        self.reset()
+        
+    def reset(self):
+        """Start counting repeats afresh, e.g. for a new sort"""
+        self.seen = Counter()
+        # The last sort's count lines stay as they are; untag them so the new counts can reuse the names
+        if self.count_tags:
+            self.text.tag_delete(*self.count_tags.values())
+        self.count_tags = {}
+        
+    def write(self, entries):
+        """Add (timestamp, message, level) entries; full details are in the log file either way"""
+        lines = []
+        counts = {}
+        for timestamp, message, level in entries:
+            if level >= logging.WARNING:
+                kind = message_kind(message)
+                self.seen[kind] += 1
+                if self.seen[kind] > self.repeats_shown:
+                    counts[kind] = self.seen[kind] - self.repeats_shown
+                    continue
+            lines.append(f"[{timestamp}] {message}\n")
+            
+        self.text.config(state=tk.NORMAL)
+        self.text.insert(tk.END, ''.join(lines))
+        for kind, count in counts.items():
+            self.show_count(kind, count)
+            
+        # Drop the oldest lines past the limit
+        excess = int(self.text.index('end-1c').split('.')[0]) - self.max_lines
+        if excess > 0:
+            self.text.delete('1.0', f'{excess + 1}.0')
+        self.text.see(tk.END)
+        self.text.config(state=tk.DISABLED)
+        
+    def show_count(self, kind, count):
+        """Move the line counting the repeats of one kind of warning to the end, updated"""
+        tag = self.count_tags.setdefault(kind, f"count{len(self.count_tags)}")
+        ranges = self.text.tag_ranges(tag)
+        if ranges:
+            self.text.delete(ranges[0], ranges[1])
+        self.text.insert(tk.END, f"… {count:,} more like \"{kind.strip()}\" (see the log file)\n", tag)
+
+class PhotoSorterGUI:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("iPhone Photo Sorter")
+        self.root.geometry("800x600")
+        self.root.resizable(True, True)
+        
+        # Variables
+        self.source_folder = tk.StringVar()
+        self.destination_folder = tk.StringVar()
+        self.copy_workers = tk.IntVar(value=DEFAULT_COPY_WORKERS)
+        self.move_files = tk.BooleanVar(value=False)
+        self.use_capture_dates = tk.BooleanVar(value=True)
+        self.verify_mode = tk.StringVar(value=DEFAULT_VERIFY_MODE)
+        self.backup_root = None
+        self.scan = None
+        # Set to cancel the analysis running in the background
+        self.analysis_cancel = None
+        self.job = None
+        self.sort_thread = None
+        self.logger = None
+        self.log_file_path = None
+        
+        # Updates posted by background threads, applied by the Tk main loop
+        self.ui_events = queue.Queue()
+        
+        self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_app)
+        self.root.after(UI_REFRESH_MS, self.process_ui_events)
+        
+    def setup_ui(self):
+        # Main frame
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # Configure grid weights
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(1, weight=1)
+        
+        # Title
+        title_label = ttk.Label(main_frame, text="iPhone Photo Sorter", 
+                               font=('Arial', 16, 'bold'))
+        title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
+        
+        # Source folder selection
+        ttk.Label(main_frame, text="Source Folder:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        ttk.Entry(main_frame, textvariable=self.source_folder, width=50).grid(row=1, column=1, sticky=(tk.W, tk.E), padx=5)
+        ttk.Button(main_frame, text="Browse", command=self.browse_source).grid(row=1, column=2, padx=5)
+        
+        # Destination folder selection
+        ttk.Label(main_frame, text="Destination:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        ttk.Entry(main_frame, textvariable=self.destination_folder, width=50).grid(row=2, column=1, sticky=(tk.W, tk.E), padx=5)
+        ttk.Button(main_frame, text="Browse", command=self.browse_destination).grid(row=2, column=2, padx=5)
+        
+        # Options frame
+        options_frame = ttk.LabelFrame(main_frame, text="Options", padding="10")
+        options_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        ttk.Label(options_frame, text="Copy workers:").pack(side=tk.LEFT)
+        ttk.Spinbox(options_frame, from_=1, to=32, width=5, textvariable=self.copy_workers).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(options_frame, text="Move files instead of copying",
+                        variable=self.move_files).pack(side=tk.LEFT, padx=15)
+        ttk.Checkbutton(options_frame, text="Sort by capture date",
+                        variable=self.use_capture_dates).pack(side=tk.LEFT)
+        # none: fastest (kernel copies), hash: checked as written, reread: also read back from disk
+        ttk.Label(options_frame, text="Check copies:").pack(side=tk.LEFT, padx=(15, 0))
+        ttk.Combobox(options_frame, textvariable=self.verify_mode, values=VERIFY_MODES,
+                     state='readonly', width=7).pack(side=tk.LEFT, padx=5)
+        
+        # Preview frame
+        preview_frame = ttk.LabelFrame(main_frame, text="Preview", padding="10")
+        preview_frame.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
+        preview_frame.columnconfigure(0, weight=1)
+        
+        # Preview text
+        self.preview_text = tk.Text(preview_frame, height=8, wrap=tk.WORD)
+        preview_scrollbar = ttk.Scrollbar(preview_frame, orient="vertical", command=self.preview_text.yview)
+        self.preview_text.configure(yscrollcommand=preview_scrollbar.set)
+        
+        self.preview_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        preview_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        
+        # Progress frame
+        progress_frame = ttk.LabelFrame(main_frame, text="Progress", padding="10")
+        progress_frame.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
+        progress_frame.columnconfigure(1, weight=1)
+        
+        # Progress bar
+        ttk.Label(progress_frame, text="Progress:").grid(row=0, column=0, sticky=tk.W)
+        self.progress_var = tk.DoubleVar()
+        self.progress_bar = ttk.Progressbar(progress_frame, variable=self.progress_var, maximum=100)
+        self.progress_bar.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=5)
+        
+        self.progress_label = ttk.Label(progress_frame, text="Ready")
+        self.progress_label.grid(row=0, column=2, padx=5)
+        
+        # Status text
+        self.status_text = tk.Text(progress_frame, height=6, wrap=tk.WORD, state=tk.DISABLED)
+        status_scrollbar = ttk.Scrollbar(progress_frame, orient="vertical", command=self.status_text.yview)
+        self.status_text.configure(yscrollcommand=status_scrollbar.set)
+        
+        self.status_text.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        status_scrollbar.grid(row=1, column=2, sticky=(tk.N, tk.S))
+        self.status_console = StatusConsole(self.status_text)
+        
+        # Buttons frame
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=6, column=0, columnspan=3, pady=10)
+        
+        self.analyze_button = ttk.Button(button_frame, text="Analyze Folders", command=self.analyze_folders)
+        self.analyze_button.pack(side=tk.LEFT, padx=5)
+        
+        self.start_button = ttk.Button(button_frame, text="Start Sorting", command=self.start_sorting, state=tk.DISABLED)
+        self.start_button.pack(side=tk.LEFT, padx=5)
+        
+        self.pause_button = ttk.Button(button_frame, text="Pause", command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_button.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_sorting, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        
+        self.delete_button = ttk.Button(button_frame, text="Delete Original", command=self.delete_original, state=tk.DISABLED)
+        self.delete_button.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(button_frame, text="Open Log File", command=self.open_log_file).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Exit", command=self.exit_app).pack(side=tk.LEFT, padx=5)
+        
+        # Configure grid weights for resizing
+        main_frame.rowconfigure(4, weight=1)
+        preview_frame.rowconfigure(0, weight=1)
+        progress_frame.rowconfigure(1, weight=1)
+        
+    def browse_source(self):
+        folder = filedialog.askdirectory(title="Select Source Folder with iPhone DCIM Subfolders")
+        if folder:
+            self.source_folder.set(folder)
+            
+    def browse_destination(self):
+        folder = filedialog.askdirectory(title="Select Destination for Backup Folder")
+        if folder:
+            self.destination_folder.set(folder)
+            
+    def log_message(self, message, level=logging.INFO):
+        """Add message to both log file and status display; safe from any thread"""
+        if self.logger:
+            self.logger.log(level, message)
+        self.show_status(message, level)
+        
+    def show_status(self, message, level=logging.INFO):
+        """Queue a line for the status display; safe from any thread"""
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        self.ui_events.put(('status', timestamp, message, level))
+        
+    def post_progress(self, value, text):
+        """Queue a progress bar update; safe from any thread"""
+        self.ui_events.put(('progress', value, text))
+        
+    def post_preview(self, *args):
+        """Queue a Preview pane update; safe from any thread"""
+        self.ui_events.put(('preview', args))
+        
+    def call_in_ui(self, func, *args, **kwargs):
+        """Queue a call to run on the Tk main loop, e.g. a dialog or widget change"""
+        self.ui_events.put(('call', func, args, kwargs))
+        
+    def process_ui_events(self):
+        """Apply queued updates in one batch, so redraws don't depend on the file rate"""
+        lines = []
+        progress = None
+        preview = None
+        
+        def flush():
+            if lines:
+                self.status_console.write(lines)
+                lines.clear()
+            if progress:
+                self.progress_var.set(progress[0])
+                self.progress_label.config(text=progress[1])
+            if preview:
+                self.show_preview(*preview)
+                
+        try:
+            while True:
+                try:
+                    event = self.ui_events.get_nowait()
+                except queue.Empty:
+                    break
+                    
+                kind = event[0]
+                if kind == 'status':
+                    lines.append(event[1:])
+                elif kind == 'progress':
+                    # Only the latest progress matters
+                    progress = event[1:]
+                elif kind == 'preview':
+                    preview = event[1]
+                elif kind == 'call':
+                    # Keep calls in order with the updates posted before them
+                    flush()
+                    progress = None
+                    preview = None
+                    func, args, kwargs = event[1:]
+                    func(*args, **kwargs)
+            flush()
+        finally:
+            self.root.after(UI_REFRESH_MS, self.process_ui_events)
+        
+    def analyze_folders(self):
+        """Analyze source folder in the background, filling in the preview as folders are scanned"""
+        if not self.source_folder.get():
+            messagebox.showerror("Error", "Please select a source folder first.")
+            return
+            
+        if not self.destination_folder.get():
+            messagebox.showerror("Error", "Please select a destination folder first.")
+            return
+            
+        source_path = self.source_folder.get()
+        dest_path = self.destination_folder.get()
+        
+        # Check if source folder exists
+        if not os.path.exists(source_path):
+            messagebox.showerror("Error", "Source folder does not exist.")
+            return
+            
+        def on_batch(scan):
+            # A snapshot; the scan carries on changing on this thread
+            self.post_preview(source_path, dest_path, list(scan.subfolders), scan.total_files,
+                              dict(scan.file_breakdown))
+            
+        def analysis_thread():
+            try:
+                # Scan the source once; the sort reuses this scan
+                scan = scan_source(source_path, on_batch=on_batch, cancel=cancel)
+            except Exception as e:
+                self.call_in_ui(messagebox.showerror, "Error", f"Error analyzing folders: {str(e)}")
+                scan = None
+            self.call_in_ui(self.finish_analysis, source_path, dest_path, scan)
+            
+        cancel = threading.Event()
+        self.analysis_cancel = cancel
+        self.scan = None
+        self.start_button.config(state=tk.DISABLED)
+        self.analyze_button.config(text="Cancel Analysis", command=self.cancel_analysis)
+        self.preview_text.delete(1.0, tk.END)
+        self.preview_text.insert(1.0, f"Scanning {source_path}...\n")
+        threading.Thread(target=analysis_thread, daemon=True).start()
+        
+    def cancel_analysis(self):
+        if self.analysis_cancel:
+            self.analysis_cancel.set()
+            
+    def finish_analysis(self, source_path, dest_path, scan):
+        """Show the final preview once the background scan ends, keeping the scan for the sort"""
+        cancelled = self.analysis_cancel.is_set()
+        self.analysis_cancel = None
+        self.analyze_button.config(text="Analyze Folders", command=self.analyze_folders)
+        if scan is None:
+            return
+        if cancelled:
+            self.preview_text.insert(tk.END, f"\nAnalysis cancelled after {scan.total_files:,} files\n")
+            return
+            
+        subfolders = scan.subfolders
+        if not subfolders:
+            messagebox.showerror("Error", "No subfolders found in source directory.")
+            return
+            
+        # Without capture dates, the folder names are the only source of years
+        if not extract_unique_years(subfolders) and not self.use_capture_dates.get():
+            messagebox.showerror("Error", "No valid year-based folders found.")
+            return
+            
+        try:
+            self.show_preview(source_path, dest_path, subfolders, scan.total_files, scan.file_breakdown, finished=True)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error analyzing folders: {str(e)}")
+            return
+            
+        # Store backup root and scan for later use
+        self.backup_root = backup_root_for(dest_path)
+        self.scan = scan
+        
+        # Enable start button
+        self.start_button.config(state=tk.NORMAL)
+        
+    def show_preview(self, source_path, dest_path, subfolders, total_files, file_breakdown, finished=False):
+        """Fill the Preview pane with analysis results so far"""
+        years = extract_unique_years(subfolders)
+        
+        # Update preview
+        preview_text = f"Analysis Results:\n"
+        preview_text += f"{'='*50}\n\n"
+        preview_text += f"Source Folder: {source_path}\n"
+        preview_text += f"Destination: {dest_path}\n\n"
+        preview_text += f"Found {len(subfolders)} subfolders\n"
+        preview_text += f"Years identified: {', '.join(years) or 'none'}\n"
+        if self.use_capture_dates.get():
+            preview_text += f"Files are sorted by capture date; folder years are used when a file has none\n"
+        if finished:
+            preview_text += f"Total files to process: {total_files:,}\n\n"
+        else:
+            preview_text += f"Scanning... {total_files:,} files so far\n\n"
+            
+        preview_text += f"Files by year:\n"
+        for year in sorted(file_breakdown.keys()):
+            preview_text += f"  {year}: {file_breakdown[year]:,} files\n"
+            
+        if finished:
+            # Check for existing backup folder
+            potential_backup = backup_root_for(dest_path)
+            preview_text += f"\nBackup folder status:\n"
+            if os.path.exists(potential_backup):
+                preview_text += f"  ✓ Existing backup folder found: {potential_backup}\n"
+                existing_years = []
+                for item in os.listdir(potential_backup):
+                    item_path = os.path.join(potential_backup, item)
+                    if os.path.isdir(item_path) and len(item) == 4 and item.isdigit():
+                        existing_years.append(item)
+                if existing_years:
+                    preview_text += f"  ✓ Existing year folders: {', '.join(sorted(existing_years))}\n"
+                    preview_text += f"  → Files will be added to existing year folders\n"
+                else:
+                    preview_text += f"  → New year folders will be created\n"
+            else:
+                preview_text += f"  → New backup folder will be created: {potential_backup}\n"
+                
+        self.preview_text.delete(1.0, tk.END)
+        self.preview_text.insert(1.0, preview_text)
+        
+    def start_sorting(self):
+        """Start the file sorting process"""
+        def sorting_thread():
+            try:
+                stats = job.run()
+                
+                # Keep the log for Delete Original
+                self.logger = job.logger
+                self.log_file_path = job.log_file_path
+                
+                # Enable delete button
+                self.call_in_ui(self.delete_button.config, state=tk.NORMAL)
+                
+                self.call_in_ui(messagebox.showinfo, "Success", 
+                    f"Sorting complete!\n\n"
+                    f"Files {'moved' if job.move else 'copied'}: {stats['copied_files']:,}\n"
+                    f"Files skipped: {stats['existing_files']:,}\n"
+                    f"Failed: {stats['failed_files']:,}\n\n"
+                    f"Log saved to: {os.path.basename(job.log_file_path)}")
+                
+            except SortCancelled:
+                # The job has already said so in the status window
+                self.log_file_path = job.log_file_path
+            except Exception as e:
+                error_msg = f"Error during sorting: {str(e)}"
+                job.log_message(error_msg, logging.ERROR)
+                self.call_in_ui(messagebox.showerror, "Error", error_msg)
+            finally:
+                self.call_in_ui(self.pause_button.config, text="Pause", state=tk.DISABLED)
+                self.call_in_ui(self.cancel_button.config, state=tk.DISABLED)
+                self.call_in_ui(self.start_button.config, state=tk.NORMAL)
+                self.call_in_ui(self.analyze_button.config, state=tk.NORMAL)
+                
+        # Read the settings here; Tk variables belong to the main thread
+        source_path = self.source_folder.get()
+        move = self.move_files.get()
+        use_metadata = self.use_capture_dates.get()
+        verify = self.verify_mode.get()
+        try:
+            workers = self.copy_workers.get()
+        except tk.TclError:
+            messagebox.showerror("Error", "Copy workers must be a whole number.")
+            return
+        # Offer to pick up where an interrupted sort of this folder stopped
+        resume = False
+        previous = read_journal(self.backup_root)
+        if previous and previous.can_resume(source_path, 'move' if move else 'copy'):
+            resume = messagebox.askyesnocancel("Resume Sort",
+                f"A previous sort of this folder stopped after {len(previous.committed):,} files.\n\n"
+                "Yes: resume and skip the files already done\n"
+                "No: start over")
+            if resume is None:
+                return
+        if move and not resume and not messagebox.askyesno("Confirm Move",
+                "Move mode removes each file from the source folder once it is in the backup.\n\n"
+                "Files already in the backup stay in the source folder.\n\n"
+                "Continue?"):
+            return
+            
+        job = SortJob(source_path, self.backup_root, workers=workers, move=move,
+                      use_metadata=use_metadata, resume=resume, verify=verify, scan=self.scan,
+                      control=JobControl(), on_message=self.show_status, on_progress=self.post_progress)
+        self.job = job
+        # The analysis scan serves this sort only; files added to the source afterwards
+        # are found by a fresh scan next time, including when resuming after a cancel
+        self.scan = None
+        
+        self.status_console.reset()
+        self.start_button.config(state=tk.DISABLED)
+        self.analyze_button.config(state=tk.DISABLED)
+        self.pause_button.config(text="Pause", state=tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL)
+        
+        # Start sorting in separate thread; not a daemon, so exiting can't cut a copy off mid-file
+        self.sort_thread = threading.Thread(target=sorting_thread)
+        self.sort_thread.start()
+        
+    def toggle_pause(self):
+        """Pause the running sort between files and chunks, or let it carry on"""
+        control = self.job.control
+        if control.paused:
+            control.resume()
+            self.pause_button.config(text="Pause")
+            self.log_message("Sorting resumed")
+        else:
+            control.pause()
+            self.pause_button.config(text="Resume")
+            self.log_message("Sorting paused; files being copied stop at their next chunk")
+            
+    def cancel_sorting(self):
+        """Stop the running sort cleanly; what is done stays done and the rest can be resumed"""
+        if not messagebox.askyesno("Cancel Sorting", "Stop sorting? Files already done stay in the backup, "
+                                   "and Start Sorting can resume the rest later."):
+            return
+        self.stop_sorting()
+        
+    def stop_sorting(self):
+        self.job.control.cancel()
+        self.pause_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.log_message("Stopping after the files in progress...")
+        
+    def exit_app(self):
+        """Quit, first stopping a running sort so no copy is left half-written"""
+        if self.sort_thread and self.sort_thread.is_alive():
+            if not messagebox.askyesno("Exit", "A sort is running. Stop it and exit?"):
+                return
+            if not self.job.control.cancelled:
+                self.stop_sorting()
+            self.wait_for_sort_then_quit()
+            return
+        self.root.quit()
+        
+    def wait_for_sort_then_quit(self):
+        if self.sort_thread.is_alive():
+            self.root.after(UI_REFRESH_MS, self.wait_for_sort_then_quit)
+        else:
+            self.root.quit()
+            
+    def delete_original(self):
+        """Check the source against the backup, then offer to delete it"""
+        source_path = self.source_folder.get()
+        
+        if not source_path or not os.path.exists(source_path):
+            messagebox.showerror("Error", "Source folder not found.")
+            return
+            
+        try:
+            workers = self.copy_workers.get()
+        except tk.TclError:
+            messagebox.showerror("Error", "Copy workers must be a whole number.")
+            return
+            
+        def verify_thread():
+            try:
+                self.log_message("Verifying source files against the backup...")
+                report = verify_sources(source_path, self.backup_root, workers, on_progress=self.post_progress)
+            except Exception as e:
+                error_msg = f"Error verifying backup: {str(e)}"
+                self.log_message(error_msg, logging.ERROR)
+                self.call_in_ui(messagebox.showerror, "Error", error_msg)
+                self.call_in_ui(self.end_delete)
+            else:
+                # The buttons stay disabled through the confirmation and any delete that follows
+                self.call_in_ui(self.confirm_delete, source_path, report, workers)
+                
+        self.status_console.reset()
+        self.delete_button.config(state=tk.DISABLED)
+        self.start_button.config(state=tk.DISABLED)
+        self.analyze_button.config(state=tk.DISABLED)
+        threading.Thread(target=verify_thread, daemon=True).start()
+        
+    def confirm_delete(self, source_path, report, workers):
+        """Delete the verified source files after confirmation, keeping everything else"""
+        if self.logger:
+            for path, reason in report.problems:
+                self.logger.warning(f"Not verified: {path}: {reason}")
+            for path in report.unrecorded:
+                self.logger.warning(f"Not in the backup: {path}")
+        self.log_message(f"Verified {len(report.verified):,} of {report.total_files:,} source files")
+        
+        if not report.verified:
+            messagebox.showwarning("Nothing to Delete",
+                "No source files could be verified against the backup, so nothing was deleted.")
+            self.end_delete()
+            return
+            
+        unverified = len(report.problems) + len(report.unrecorded)
+        kept_note = (f"{unverified:,} files that could not be verified will be kept; the log file lists them.\n\n"
+                     if unverified else "")
+        
+        # Double confirmation
+        response = messagebox.askyesno("Confirm Deletion", 
+            f"{len(report.verified):,} of {report.total_files:,} files were verified against the backup.\n\n"
+            f"{kept_note}"
+            f"Are you sure you want to delete the verified files from the original folder?\n\n"
+            f"Folder: {source_path}")
+            
+        if not response:
+            self.end_delete()
+            return
+            
+        # Final confirmation
+        response = messagebox.askyesno("Final Confirmation", 
+            "This is your last chance to cancel.\n\n"
+            "Are you absolutely sure you want to delete the verified files?")
+            
+        if not response:
+            self.end_delete()
+            return
+            
+        def delete_thread():
+            try:
+                self.log_message(f"Deleting verified files from: {source_path}")
+                result = delete_verified(source_path, self.backup_root, workers, on_progress=self.post_progress)
+            except Exception as e:
+                error_msg = f"Error deleting original files: {str(e)}"
+                self.log_message(error_msg, logging.ERROR)
+                self.call_in_ui(messagebox.showerror, "Error", error_msg)
+                self.call_in_ui(self.end_delete)
+                return
+                
+            # The deleted files are gone, so Delete Original stays off
+            self.call_in_ui(self.end_delete, False)
+            if self.logger:
+                for path, reason in result.kept:
+                    self.logger.warning(f"Kept {path}: {reason}")
+            message = (f"Deleted {len(result.deleted):,} files and {len(result.removed_folders):,} empty folders; "
+                       f"kept {unverified + len(result.kept):,} files")
+            self.log_message(message)
+            self.call_in_ui(messagebox.showinfo, "Delete Complete", message + ".")
+            
+        threading.Thread(target=delete_thread, daemon=True).start()
+        
+    def end_delete(self, allow_delete=True):
+        """Give back the buttons held while verifying and deleting"""
+        self.start_button.config(state=tk.NORMAL)
+        self.analyze_button.config(state=tk.NORMAL)
+        if allow_delete:
+            self.delete_button.config(state=tk.NORMAL)
+            
+    def open_log_file(self):
+        """Open the log file in default text editor"""
+        if self.log_file_path and os.path.exists(self.log_file_path):
+            try:
+                os.startfile(self.log_file_path)  # Windows
+            except AttributeError:
+                try:
+                    os.system(f'open "{self.log_file_path}"')  # macOS
+                except:
+                    os.system(f'xdg-open "{self.log_file_path}"')  # Linux
+        else:
+            messagebox.showinfo("Info", "No log file available yet. Run the sorting process first.")
+
+def main():
+    root = tk.Tk()
+    app = PhotoSorterGUI(root)
+    root.mainloop()
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import datetime
+
+# Journal of the current or last sort, kept at the backup root
+JOURNAL_FILE_NAME = ".photo_sorter_journal.jsonl"
+# Records written between fsyncs, and the longest time between them
+JOURNAL_SYNC_INTERVAL = 256
+JOURNAL_SYNC_SECONDS = 2.0
+
+class JournalState:
+    """What a journal says about its run: transfers done, transfers started but not done"""
+    def __init__(self, source_path, mode):
+        self.source_path = source_path
+        self.mode = mode
+        self.finished = False
+        # source path -> (backup path, size, mtime_ns) of files copied, moved or found in the backup
+        self.committed = {}
+        # backup path -> source path of transfers that may have been cut off
+        self.pending = {}
+        self.planned = {}
+        # backup path -> content hash taken while copying
+        self.hashes = {}
+        # source path -> (size, mtime_ns) of files checked against the backup
+        self.verified = {}
+        
+    def can_resume(self, source_path, mode):
+        """True if this is an unfinished run of the same job"""
+        return not self.finished and self.source_path == source_path and self.mode == mode
+
+def read_journal(backup_root):
+    """Replay the journal at the backup root, or None if there isn't one"""
+    path = os.path.join(backup_root, JOURNAL_FILE_NAME)
+    try:
+        f = open(path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return None
+        
+    state = None
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a line half written; a resume continues after it
+                continue
+            kind = record.get('type')
+            if kind == 'job':
+                state = JournalState(record['source'], record['mode'])
+            elif state is None:
+                break
+            elif kind == 'plan':
+                state.planned[record['dst']] = (record['src'], record['size'], record['mtime_ns'])
+                state.pending[record['dst']] = record['src']
+            elif kind == 'done' and record['dst'] in state.planned:
+                src, size, mtime_ns = state.planned[record['dst']]
+                state.committed[src] = (record['dst'], size, mtime_ns)
+                state.pending.pop(record['dst'], None)
+                if record.get('hash'):
+                    state.hashes[record['dst']] = record['hash']
+            elif kind == 'failed':
+                state.pending.pop(record['dst'], None)
+            elif kind == 'duplicate':
+                state.committed[record['src']] = (record['dst'], record['size'], record['mtime_ns'])
+            elif kind == 'verified':
+                state.verified[record['src']] = (record['size'], record['mtime_ns'])
+            elif kind == 'mismatch':
+                state.verified.pop(record['src'], None)
+            elif kind == 'end':
+                state.finished = True
+    return state
+
+class JobJournal:
+    """Append-only JSON-lines journal of a sort: the job, each planned transfer and each outcome"""
+    def __init__(self, backup_root):
+        self.path = os.path.join(backup_root, JOURNAL_FILE_NAME)
+        self.file = None
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        
+    def start(self, source_path, mode, resume=False):
+        """Start a new journal, or continue the existing one when resuming"""
+        if resume:
+            self.reopen()
+            self._write({'type': 'resume', 'time': datetime.datetime.now().isoformat()})
+        else:
+            self.file = open(self.path, 'w', encoding='utf-8')
+            self._write({'type': 'job', 'source': source_path, 'mode': mode,
+                         'time': datetime.datetime.now().isoformat()})
+        self.sync()
+        
+    def reopen(self):
+        """Continue the existing journal, e.g. to add verification results"""
+        cut_off = not self._ends_with_newline()
+        self.file = open(self.path, 'a', encoding='utf-8')
+        # Start on a fresh line if the last record was cut off
+        if cut_off:
+            self.file.write('\n')
+            
+    def plan(self, src, dst, size, mtime_ns):
+        """Record a transfer before it starts, so a crash leaves a note of the file to roll back"""
+        self._write({'type': 'plan', 'src': src, 'dst': dst, 'size': size, 'mtime_ns': mtime_ns})
+        # Reaches the OS before the destination file is created; fsync is batched
+        self.file.flush()
+        
+    def done(self, dst, content_hash=None):
+        record = {'type': 'done', 'dst': dst}
+        if content_hash:
+            record['hash'] = content_hash
+        self._write(record)
+        
+    def failed(self, dst):
+        self._write({'type': 'failed', 'dst': dst})
+        
+    def duplicate(self, src, dst, size, mtime_ns):
+        self._write({'type': 'duplicate', 'src': src, 'dst': dst, 'size': size, 'mtime_ns': mtime_ns})
+        
+    def verified(self, src, size, mtime_ns):
+        """Record that the backup holds src's data, as src was at this size and mtime"""
+        self._write({'type': 'verified', 'src': src, 'size': size, 'mtime_ns': mtime_ns})
+        
+    def mismatch(self, src):
+        """Record that a later check found the backup doesn't hold src's data"""
+        self._write({'type': 'mismatch', 'src': src})
+        
+    def finish(self):
+        """Mark the run complete and close"""
+        self._write({'type': 'end', 'time': datetime.datetime.now().isoformat()})
+        self.close()
+        
+    def close(self):
+        if self.file:
+            self.sync()
+            self.file.close()
+            self.file = None
+            
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+            
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        
+    def _write(self, record):
+        self.file.write(json.dumps(record) + '\n')
+        self.unsynced += 1
+        if self.unsynced >= JOURNAL_SYNC_INTERVAL or time.monotonic() - self.last_sync >= JOURNAL_SYNC_SECONDS:
+            self.sync()
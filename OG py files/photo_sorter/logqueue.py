@@ -0,0 +1,71 @@
+import time
+import queue
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Longest a log line waits in memory before it is written out
+LOG_FLUSH_SECONDS = 2.0
+
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that leaves lines in the file's buffer, flushing at error level or every few seconds"""
+    def __init__(self, filename, encoding=None, flush_seconds=LOG_FLUSH_SECONDS):
+        super().__init__(filename, encoding=encoding)
+        self.flush_seconds = flush_seconds
+        self.last_flush = time.monotonic()
+        
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR or time.monotonic() - self.last_flush >= self.flush_seconds:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+            
+    def flush(self):
+        super().flush()
+        self.last_flush = time.monotonic()
+
+class TimedFlushListener(QueueListener):
+    """Queue listener that also flushes its handlers whenever the queue has been quiet for a while"""
+    def __init__(self, log_queue, *handlers, flush_seconds=LOG_FLUSH_SECONDS):
+        super().__init__(log_queue, *handlers)
+        self.flush_seconds = flush_seconds
+        
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.flush_seconds if block else None)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+class BackgroundQueueHandler(QueueHandler):
+    """Hands records to a listener thread that writes them to target, so logging never waits on the disk"""
+    def __init__(self, target):
+        super().__init__(queue.Queue())
+        self.listener = TimedFlushListener(self.queue, target)
+        self.listener_lock = threading.Lock()
+        self.listening = True
+        self.listener.start()
+        
+    def flush(self):
+        """Write out everything logged so far"""
+        with self.listener_lock:
+            if self.listening:
+                # Stopping the listener drains the queue; it then starts afresh
+                self.listener.stop()
+                for handler in self.listener.handlers:
+                    handler.flush()
+                self.listener.start()
+                
+    def close(self):
+        with self.listener_lock:
+            if self.listening:
+                self.listening = False
+                self.listener.stop()
+                for handler in self.listener.handlers:
+                    handler.close()
+        super().close()
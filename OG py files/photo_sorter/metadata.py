@@ -0,0 +1,411 @@
+import os
+import signal
+import struct
+import datetime
+
+# Upper bounds on what is read from any one file
+MAX_JPEG_SEGMENTS = 32
+MAX_EXIF_SIZE = 256 * 1024
+MAX_BOX_HEADERS = 64
+MAX_META_SIZE = 1024 * 1024
+
+# EXIF tags holding dates, best first
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+TAG_DATETIME = 0x0132
+
+# ftyp brands of HEIF/HEIC/AVIF stills; other ISO media files are read as QuickTime/MP4
+HEIF_BRANDS = {b'heic', b'heix', b'heim', b'heis', b'hevc', b'hevx', b'mif1', b'msf1', b'avif', b'avis'}
+QUICKTIME_TOP_BOXES = {b'moov', b'mdat', b'wide', b'free', b'skip', b'pnot'}
+
+# QuickTime times count seconds from 1904-01-01 UTC
+QUICKTIME_EPOCH_OFFSET = 2082844800
+
+# Capture timestamps are seconds from this moment, in the camera's local time
+TIMESTAMP_EPOCH = datetime.datetime(1970, 1, 1)
+
+# Files parsed per process task, and the files seen before a process pool is worth starting
+METADATA_CHUNK_SIZE = 256
+MIN_POOL_FILES = 2000
+
+class _Reader:
+    """Bounded positional reads from an open file (pread where the OS has it)"""
+    def __init__(self, fd):
+        self.fd = fd
+        self.size = os.fstat(fd).st_size
+        
+    def read_at(self, offset, length):
+        length = max(0, min(length, self.size - offset))
+        if length == 0:
+            return b''
+        if hasattr(os, 'pread'):
+            return os.pread(self.fd, length, offset)
+        os.lseek(self.fd, offset, os.SEEK_SET)
+        return os.read(self.fd, length)
+
+def media_type(header):
+    """Classify a file from its first 12 bytes: 'jpeg', 'heif', 'quicktime' or None"""
+    if header[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if header[4:8] == b'ftyp':
+        return 'heif' if header[8:12] in HEIF_BRANDS else 'quicktime'
+    if header[4:8] in QUICKTIME_TOP_BOXES:
+        return 'quicktime'
+    return None
+
+def read_capture_time(path):
+    """Capture time from a photo or video header as (datetime, media type); datetime may be None"""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        reader = _Reader(fd)
+        kind = media_type(reader.read_at(0, 12))
+        try:
+            if kind == 'jpeg':
+                return _jpeg_time(reader), kind
+            if kind == 'heif':
+                return _heif_time(reader), kind
+            if kind == 'quicktime':
+                return _quicktime_time(reader), kind
+        except (struct.error, ValueError, OverflowError, IndexError):
+            # Damaged, truncated or unusual header; the caller falls back to the folder year
+            pass
+        return None, kind
+    finally:
+        os.close(fd)
+
+def read_chunk(start, paths):
+    """Read one chunk in a worker: compact (index, timestamp, media type) results and (index, error) pairs"""
+    results = []
+    errors = []
+    for index, path in enumerate(paths, start):
+        try:
+            captured, kind = read_capture_time(path)
+        except Exception as e:
+            # One unreadable file keeps its folder year rather than failing the chunk
+            errors.append((index, str(e) or type(e).__name__))
+            continue
+        timestamp = (captured - TIMESTAMP_EPOCH).total_seconds() if captured else None
+        results.append((index, timestamp, kind))
+    return results, errors
+
+def timestamp_to_datetime(timestamp):
+    """Turn a capture timestamp from read_chunk back into a datetime"""
+    return TIMESTAMP_EPOCH + datetime.timedelta(seconds=timestamp)
+
+def _ignore_interrupts():
+    """Leave Ctrl+C to the main process, which stops the job cleanly"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+class CaptureTimeReader:
+    """Reads capture times for a stream of files, moving to a process pool once the stream proves long"""
+    def __init__(self, processes=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.executor = None
+        self.seen = 0
+        # (path, item) pairs waiting to fill a chunk, and chunks out in the pool by their future
+        self.buffer = []
+        self.pending = {}
+        
+    def add(self, paths, items):
+        """Queue files for reading, yielding (items, results, errors) for each chunk read so far"""
+        self.seen += len(paths)
+        self.buffer.extend(zip(paths, items))
+        # Short runs are over before a pool would have started
+        if self.executor is None and self.processes > 1 and self.seen >= MIN_POOL_FILES:
+            # Imported here so the command line doesn't pay for multiprocessing
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # The other pipeline stages are running by now, and forking a process with
+            # threads can deadlock the child; workers start from a fresh interpreter instead
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self.executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context(method),
+                                                initializer=_ignore_interrupts)
+            
+        # Without a pool there is nothing to gain by waiting for a full chunk
+        while self.buffer and (self.executor is None or len(self.buffer) >= METADATA_CHUNK_SIZE):
+            yield from self._read(self._take_chunk())
+            
+    def finish(self):
+        """Read whatever is still queued or out in the pool"""
+        while self.buffer:
+            yield from self._read(self._take_chunk())
+        yield from self._collect(0)
+        
+    def close(self):
+        if self.executor is not None:
+            for future in self.pending:
+                future.cancel()
+            self.executor.shutdown()
+            self.executor = None
+            
+    def _take_chunk(self):
+        chunk = self.buffer[:METADATA_CHUNK_SIZE]
+        del self.buffer[:METADATA_CHUNK_SIZE]
+        return [path for path, _ in chunk], [item for _, item in chunk]
+        
+    def _read(self, chunk):
+        paths, items = chunk
+        if self.executor is not None:
+            try:
+                self.pending[self.executor.submit(read_chunk, 0, paths)] = chunk
+            except (RuntimeError, OSError, NotImplementedError):
+                # No usable process pool here (BrokenProcessPool is a RuntimeError)
+                self._drop_pool()
+            else:
+                # A couple of chunks per process in flight keeps them busy without reading ahead of the copy
+                yield from self._collect(self.processes * 2)
+                return
+        results, errors = read_chunk(0, paths)
+        yield items, results, errors
+        
+    def _collect(self, limit):
+        from concurrent.futures import wait, FIRST_COMPLETED
+        while len(self.pending) > limit:
+            done, _ = wait(self.pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                paths, items = self.pending.pop(future)
+                try:
+                    results, errors = future.result()
+                except (RuntimeError, OSError):
+                    # The pool broke; read what it lost in this process
+                    self._drop_pool()
+                    results, errors = read_chunk(0, paths)
+                yield items, results, errors
+                
+    def _drop_pool(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        self.processes = 1
+
+def _jpeg_time(reader):
+    """DateTimeOriginal from the APP1/EXIF segment, walking segment headers only"""
+    offset = 2
+    for _ in range(MAX_JPEG_SEGMENTS):
+        header = reader.read_at(offset, 4)
+        if len(header) < 4 or header[0] != 0xFF:
+            return None
+        marker, length = header[1], struct.unpack('>H', header[2:])[0]
+        # Image data starts at SOS; EXIF always comes before it
+        if marker in (0xDA, 0xD9):
+            return None
+        if marker == 0xE1:
+            segment = reader.read_at(offset + 4, min(length - 2, MAX_EXIF_SIZE))
+            if segment.startswith(b'Exif\x00\x00'):
+                return _exif_time(segment[6:])
+        offset += 2 + length
+    return None
+
+def _exif_time(tiff):
+    """Best date from a TIFF/EXIF block"""
+    if tiff[:2] == b'II':
+        order = '<'
+    elif tiff[:2] == b'MM':
+        order = '>'
+    else:
+        return None
+    if struct.unpack(order + 'H', tiff[2:4])[0] != 42:
+        return None
+        
+    ifd0 = _read_ifd(tiff, order, struct.unpack(order + 'I', tiff[4:8])[0])
+    found = {}
+    if TAG_EXIF_IFD in ifd0:
+        found.update(_read_ifd(tiff, order, _entry_value(tiff, order, ifd0[TAG_EXIF_IFD])))
+    found.update({tag: entry for tag, entry in ifd0.items() if tag not in found})
+    
+    for tag in (TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED, TAG_DATETIME):
+        if tag in found:
+            parsed = _parse_exif_date(tiff, order, found[tag])
+            if parsed:
+                return parsed
+    return None
+
+def _read_ifd(tiff, order, offset):
+    """Entries of one IFD as tag -> (type, count, value field offset)"""
+    entries = {}
+    if offset <= 0 or offset + 2 > len(tiff):
+        return entries
+    count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+    for i in range(count):
+        start = offset + 2 + i * 12
+        if start + 12 > len(tiff):
+            break
+        tag, kind, value_count = struct.unpack(order + 'HHI', tiff[start:start + 8])
+        entries[tag] = (kind, value_count, start + 8)
+    return entries
+
+def _entry_value(tiff, order, entry):
+    """A LONG entry's value, e.g. the Exif IFD pointer"""
+    kind, value_count, field = entry
+    return struct.unpack(order + 'I', tiff[field:field + 4])[0]
+
+def _parse_exif_date(tiff, order, entry):
+    """Parse an ASCII 'YYYY:MM:DD HH:MM:SS' entry"""
+    kind, value_count, field = entry
+    if kind != 2 or value_count < 19:
+        return None
+    start = struct.unpack(order + 'I', tiff[field:field + 4])[0] if value_count > 4 else field
+    text = tiff[start:start + 19].decode('ascii', 'replace')
+    try:
+        return datetime.datetime.strptime(text, "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        # Unset dates are written as "0000:00:00 00:00:00"
+        return None
+
+def _boxes(reader, start, end):
+    """Iterate (type, payload offset, payload end) of the ISO media boxes in a range"""
+    offset = start
+    for _ in range(MAX_BOX_HEADERS):
+        if offset + 8 > end:
+            return
+        header = reader.read_at(offset, 16)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header[:8])
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                return
+            size = struct.unpack('>Q', header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            return
+        yield box_type, offset + header_size, min(offset + size, end)
+        offset += size
+
+def _find_box(reader, start, end, wanted):
+    for box_type, payload, payload_end in _boxes(reader, start, end):
+        if box_type == wanted:
+            return payload, payload_end
+    return None
+
+def _heif_time(reader):
+    """DateTimeOriginal from the Exif item of a HEIF/HEIC file, located via meta/iinf/iloc"""
+    meta = _find_box(reader, 0, reader.size, b'meta')
+    if not meta:
+        return None
+    # meta is a full box: skip version and flags
+    meta_start, meta_end = meta[0] + 4, meta[1]
+    if meta_end - meta_start > MAX_META_SIZE:
+        return None
+    data = reader.read_at(meta_start, meta_end - meta_start)
+    
+    children = {box_type: (payload, payload_end)
+                for box_type, payload, payload_end in _boxes(_BytesReader(data), 0, len(data))}
+    if b'iinf' not in children or b'iloc' not in children:
+        return None
+    exif_id = _heif_exif_item(data, *children[b'iinf'])
+    if exif_id is None:
+        return None
+    location = _heif_item_location(data, *children[b'iloc'], exif_id)
+    if location is None:
+        return None
+        
+    offset, length = location
+    item = reader.read_at(offset, min(length, MAX_EXIF_SIZE))
+    # The item starts with the offset of the TIFF header past a 4-byte field
+    tiff_start = 4 + struct.unpack('>I', item[:4])[0]
+    return _exif_time(item[tiff_start:])
+
+def _heif_exif_item(data, start, end):
+    """item_ID of the 'Exif' item listed in iinf"""
+    if start + 4 > end:
+        return None
+    version = data[start]
+    pos = start + 4
+    if version == 0:
+        pos += 2
+    else:
+        pos += 4
+    for box_type, payload, payload_end in _boxes(_BytesReader(data), pos, end):
+        if box_type != b'infe' or payload >= payload_end:
+            continue
+        infe_version = data[payload]
+        if infe_version < 2:
+            continue
+        pos = payload + 4
+        if infe_version == 2:
+            item_id = struct.unpack('>H', data[pos:pos + 2])[0]
+            pos += 2
+        else:
+            item_id = struct.unpack('>I', data[pos:pos + 4])[0]
+            pos += 4
+        # Skip item_protection_index
+        item_type = data[pos + 2:pos + 6]
+        if item_type == b'Exif':
+            return item_id
+    return None
+
+def _heif_item_location(data, start, end, wanted_id):
+    """File (offset, length) of an item's first extent from iloc"""
+    if start + 6 > end:
+        return None
+    version = data[start]
+    pos = start + 4
+    offset_size, length_size = data[pos] >> 4, data[pos] & 0x0F
+    base_offset_size, index_size = data[pos + 1] >> 4, data[pos + 1] & 0x0F
+    pos += 2
+    if version < 2:
+        item_count = struct.unpack('>H', data[pos:pos + 2])[0]
+        pos += 2
+    else:
+        item_count = struct.unpack('>I', data[pos:pos + 4])[0]
+        pos += 4
+        
+    def read_uint(size):
+        nonlocal pos
+        value = int.from_bytes(data[pos:pos + size], 'big') if size else 0
+        pos += size
+        return value
+        
+    for _ in range(item_count):
+        if pos >= end:
+            break
+        item_id = read_uint(2 if version < 2 else 4)
+        construction_method = read_uint(2) & 0x0F if version in (1, 2) else 0
+        read_uint(2)  # data_reference_index
+        base_offset = read_uint(base_offset_size)
+        extent_count = read_uint(2)
+        extents = []
+        for _ in range(extent_count):
+            if version in (1, 2):
+                read_uint(index_size)
+            extent_offset = read_uint(offset_size)
+            extent_length = read_uint(length_size)
+            extents.append((base_offset + extent_offset, extent_length))
+        # Only items stored directly in the file are supported
+        if item_id == wanted_id and extents and construction_method == 0:
+            return extents[0]
+    return None
+
+class _BytesReader:
+    """_Reader interface over bytes already read"""
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+        
+    def read_at(self, offset, length):
+        return self.data[offset:offset + length]
+
+def _quicktime_time(reader):
+    """Creation time from moov/mvhd of a MOV or MP4, skipping over mdat"""
+    moov = _find_box(reader, 0, reader.size, b'moov')
+    if not moov:
+        return None
+    mvhd = _find_box(reader, moov[0], moov[1], b'mvhd')
+    if not mvhd:
+        return None
+    header = reader.read_at(mvhd[0], min(12, mvhd[1] - mvhd[0]))
+    if len(header) < 8:
+        return None
+    if header[0] == 1:
+        seconds = struct.unpack('>Q', header[4:12])[0]
+    else:
+        seconds = struct.unpack('>I', header[4:8])[0]
+    if seconds == 0:
+        return None
+    # Stored in UTC; convert to local time like the photo EXIF dates
+    return datetime.datetime.fromtimestamp(seconds - QUICKTIME_EPOCH_OFFSET)
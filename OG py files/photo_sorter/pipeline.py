@@ -0,0 +1,56 @@
+import queue
+import threading
+
+# Batches waiting between two pipeline stages before the earlier one blocks
+PIPELINE_QUEUE_SIZE = 8
+# How often a blocked stage checks whether the pipeline was torn down
+PIPELINE_POLL_SECONDS = 0.1
+
+class _StageEnd:
+    """Marks the end of a stage's output, carrying the error that ended it, if any"""
+    def __init__(self, error=None):
+        self.error = error
+
+def run_stage(items, name, maxsize=PIPELINE_QUEUE_SIZE):
+    """Run an iterator on its own thread, handing what it yields on through a bounded queue"""
+    handoff = queue.Queue(maxsize)
+    stopped = threading.Event()
+    
+    def put(item):
+        # Blocks while the next stage is behind, unless the pipeline stops
+        while not stopped.is_set():
+            try:
+                handoff.put(item, timeout=PIPELINE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+        
+    def produce():
+        end = _StageEnd()
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            end = _StageEnd(e)
+        finally:
+            # Runs the stage's own cleanup on this thread, where it ran
+            close = getattr(items, 'close', None)
+            if close:
+                close()
+        put(end)
+        
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = handoff.get()
+            if isinstance(item, _StageEnd):
+                if item.error is not None:
+                    raise item.error
+                return
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
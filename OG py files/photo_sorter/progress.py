@@ -0,0 +1,110 @@
+import time
+from collections import deque
+
+# Span of the moving averages, and the least time between published updates
+PROGRESS_WINDOW_SECONDS = 10.0
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+def format_bytes(count):
+    """Size for display, e.g. 1.5 GB"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1000:
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1000
+    return f"{count:.1f} TB"
+
+def format_duration(seconds):
+    """Duration for display as h:mm:ss or m:ss"""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+class ProgressTracker:
+    """Files and bytes planned and done, with current and average throughput and an ETA"""
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        # Written by the scan stage, while the copy stage writes the done counts
+        self.files_total = 0
+        self.bytes_total = 0
+        self.files_done = 0
+        self.bytes_done = 0
+        # The part of the done counts that was actually copied, which the rates are measured on
+        self.files_transferred = 0
+        self.bytes_transferred = 0
+        self.total_known = False
+        self.started = clock()
+        # (time, files transferred, bytes transferred), spanning the moving-average window
+        self.samples = deque([(self.started, 0, 0)])
+        self.last_published = None
+        
+    def add_planned(self, files, size):
+        self.files_total += files
+        self.bytes_total += size
+        
+    def add_done(self, files, size, transferred=False):
+        self.files_done += files
+        self.bytes_done += size
+        if transferred:
+            self.files_transferred += files
+            self.bytes_transferred += size
+        
+    def due(self):
+        """True when it is time to publish another update, recording a throughput sample"""
+        now = self.clock()
+        if self.last_published is not None and now - self.last_published < PROGRESS_INTERVAL_SECONDS:
+            return False
+        self.last_published = now
+        self.samples.append((now, self.files_transferred, self.bytes_transferred))
+        while len(self.samples) > 2 and now - self.samples[1][0] >= PROGRESS_WINDOW_SECONDS:
+            self.samples.popleft()
+        return True
+        
+    @staticmethod
+    def _rates(first, last):
+        elapsed = last[0] - first[0]
+        if elapsed <= 0:
+            return 0.0, 0.0
+        return (last[1] - first[1]) / elapsed, (last[2] - first[2]) / elapsed
+        
+    def snapshot(self):
+        """Progress as plain values: percent done by bytes, files and bytes per second, and the ETA"""
+        # Skipped and failed files count as done, so the bar reaches 100% whatever happens to them
+        files_total = max(self.files_total, self.files_done)
+        bytes_total = max(self.bytes_total, self.bytes_done)
+        if bytes_total:
+            percent = self.bytes_done / bytes_total * 100
+        else:
+            percent = self.files_done / max(1, files_total) * 100
+            
+        # Current rates over the last interval, average rates over the window; skipped and failed
+        # files take next to no time, so counting them would overstate the speed and understate the ETA
+        files_per_s, bytes_per_s = self._rates(self.samples[-2], self.samples[-1]) if len(self.samples) > 1 else (0.0, 0.0)
+        avg_files_per_s, avg_bytes_per_s = self._rates(self.samples[0], self.samples[-1])
+        eta_seconds = None
+        if self.total_known and avg_bytes_per_s > 0:
+            eta_seconds = (bytes_total - self.bytes_done) / avg_bytes_per_s
+        return {
+            'percent': percent,
+            'files_done': self.files_done,
+            'files_total': files_total,
+            'bytes_done': self.bytes_done,
+            'bytes_total': bytes_total,
+            'files_per_s': files_per_s,
+            'avg_files_per_s': avg_files_per_s,
+            'bytes_per_s': bytes_per_s,
+            'avg_bytes_per_s': avg_bytes_per_s,
+            'eta_seconds': eta_seconds,
+            'elapsed_seconds': self.clock() - self.started
+        }
+        
+    def describe(self, snapshot=None):
+        """One line for a progress label, e.g. 1,200/5,000 files, 2.1 GB/9.8 GB, 45.0 MB/s ..."""
+        s = snapshot or self.snapshot()
+        files_total = f"{s['files_total']:,}" if self.total_known else f"{s['files_total']:,}+"
+        text = (f"{s['files_done']:,}/{files_total} files, "
+                f"{format_bytes(s['bytes_done'])}/{format_bytes(s['bytes_total'])}, "
+                f"{format_bytes(s['bytes_per_s'])}/s (avg {format_bytes(s['avg_bytes_per_s'])}/s), "
+                f"{s['avg_files_per_s']:,.0f} files/s")
+        if s['eta_seconds'] is not None:
+            text += f", ETA {format_duration(s['eta_seconds'])}"
+        return text
@@ -0,0 +1,156 @@
+import os
+from array import array
+from collections import defaultdict, namedtuple
+
+
+# Most files a scan hands on at a time
+SCAN_BATCH_SIZE = 256
+
+# A file found by the source scan, with the stat data cached from its DirEntry
+ScannedFile = namedtuple('ScannedFile', ['path', 'year', 'size', 'mtime_ns', 'inode', 'device'])
+
+def folder_year(folder_name):
+    """Get the year from a DCIM folder name like 2023ABCD"""
+    return folder_name[:4] if len(folder_name) >= 4 and folder_name[:4].isdigit() else "Unknown"
+
+# How a FileTable stores the "Unknown" year
+UNKNOWN_YEAR_CODE = 0xFFFF
+
+class FileTable:
+    """Compact table of scanned files, read back as ScannedFile rows; tens of bytes a file instead of hundreds"""
+    def __init__(self):
+        # Folder paths stored once each, and each file's index into them
+        self.folders = []
+        self.folder_index = {}
+        self.folder_ids = array('I')
+        # Names back to back in one blob; file i's is names[name_offsets[i]:name_offsets[i + 1]]
+        self.names = bytearray()
+        self.name_offsets = array('Q', [0])
+        self.years = array('H')
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.inodes = array('Q')
+        self.devices = array('Q')
+        
+    def __len__(self):
+        return len(self.sizes)
+        
+    def append(self, scanned):
+        folder, name = os.path.split(scanned.path)
+        folder_id = self.folder_index.get(folder)
+        if folder_id is None:
+            folder_id = self.folder_index[folder] = len(self.folders)
+            self.folders.append(folder)
+        self.folder_ids.append(folder_id)
+        self.names += os.fsencode(name)
+        self.name_offsets.append(len(self.names))
+        self.years.append(UNKNOWN_YEAR_CODE if scanned.year == "Unknown" else int(scanned.year))
+        self.sizes.append(scanned.size)
+        self.mtimes.append(scanned.mtime_ns)
+        self.inodes.append(scanned.inode)
+        self.devices.append(scanned.device)
+        
+    def extend(self, files):
+        for scanned in files:
+            self.append(scanned)
+            
+    def __getitem__(self, index):
+        # Negative indexes count from the end; out of range raises IndexError
+        index = range(len(self))[index]
+        name = os.fsdecode(bytes(self.names[self.name_offsets[index]:self.name_offsets[index + 1]]))
+        year = self.years[index]
+        return ScannedFile(os.path.join(self.folders[self.folder_ids[index]], name),
+                           "Unknown" if year == UNKNOWN_YEAR_CODE else f"{year:04d}",
+                           self.sizes[index], self.mtimes[index], self.inodes[index], self.devices[index])
+                           
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+            
+    def batches(self, batch_size=SCAN_BATCH_SIZE):
+        """The rows in lists of at most batch_size, as the scan hands them down the sort pipeline"""
+        for start in range(0, len(self), batch_size):
+            yield [self[index] for index in range(start, min(start + batch_size, len(self)))]
+
+class SourceScan:
+    """Result of a single pass over the source folder"""
+    def __init__(self, source_path):
+        self.source_path = source_path
+        self.subfolders = []
+        self.files = FileTable()
+        self.file_breakdown = defaultdict(int)
+        self.errors = []
+        # False while the scan runs, and for good if it was cancelled
+        self.complete = False
+        
+    @property
+    def total_files(self):
+        return len(self.files)
+
+def list_subfolders(source_path):
+    """Names of the DCIM-style folders directly inside the source"""
+    with os.scandir(source_path) as entries:
+        return [entry.name for entry in entries if entry.is_dir()]
+
+def iter_source_batches(source_path, subfolders=None, on_error=None, batch_size=SCAN_BATCH_SIZE):
+    """Walk the source folder with os.scandir, yielding files in batches as soon as they are found"""
+    if subfolders is None:
+        subfolders = list_subfolders(source_path)
+        
+    for subfolder in subfolders:
+        year = folder_year(subfolder)
+        
+        # Iterative walk; like os.walk, symlinked folders are listed but not followed
+        pending = [os.path.join(source_path, subfolder)]
+        while pending:
+            current = pending.pop()
+            batch = []
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir():
+                                if not entry.is_symlink():
+                                    pending.append(entry.path)
+                                continue
+                            try:
+                                st = entry.stat()
+                            except OSError:
+                                # Broken symlink, fall back to the link itself
+                                st = entry.stat(follow_symlinks=False)
+                        except OSError as e:
+                            if on_error:
+                                on_error(entry.path, e)
+                            continue
+                        batch.append(ScannedFile(entry.path, year, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev))
+                        if len(batch) >= batch_size:
+                            yield batch
+                            batch = []
+            except OSError as e:
+                if on_error:
+                    on_error(current, e)
+            if batch:
+                yield batch
+
+def scan_source(source_path, on_batch=None, cancel=None):
+    """Walk the source folder once, keeping each file's stat result; on_batch(scan) follows along"""
+    scan = SourceScan(source_path)
+    scan.subfolders = list_subfolders(source_path)
+    
+    for batch in iter_source_batches(source_path, scan.subfolders, on_error=lambda path, e: scan.errors.append((path, e))):
+        # A cancelled scan is left incomplete
+        if cancel is not None and cancel.is_set():
+            return scan
+        scan.files.extend(batch)
+        for scanned in batch:
+            scan.file_breakdown[scanned.year] += 1
+        if on_batch:
+            on_batch(scan)
+            
+    scan.complete = True
+    return scan
+
+def extract_unique_years(folder_names):
+    """Extract years from folder names"""
+    years = {name[:4] for name in folder_names if len(name) >= 4 and name[:4].isdigit()}
+    return sorted(years)
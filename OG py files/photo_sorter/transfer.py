@@ -0,0 +1,277 @@
+import os
+import sys
+import errno
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Number of files copied at the same time
+DEFAULT_COPY_WORKERS = 4
+
+# Chunk size for kernel copies and buffer size for the userspace fallback
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# ioctl request for FICLONE (copy-on-write clone on btrfs/XFS)
+FICLONE = 0x40049409
+
+# Files are written under a temporary name in the same folder, then renamed into place
+PARTIAL_SUFFIX = ".photo_sorter.partial"
+
+# When written files are flushed to disk: never, after each file, or in batches
+FSYNC_POLICIES = ('none', 'file', 'batch')
+DEFAULT_FSYNC_POLICY = 'batch'
+FSYNC_BATCH_FILES = 256
+FSYNC_BATCH_BYTES = 1024 * 1024 * 1024
+
+# How copies are checked: not at all, by hashing the data as it is copied,
+# or by also reading the copy back from disk and comparing. Hashing sends the
+# data through Python, so only 'none' uses the kernel copies (reflinks are
+# fast either way)
+VERIFY_MODES = ('none', 'hash', 'reread')
+DEFAULT_VERIFY_MODE = 'hash'
+
+# Errors meaning a transfer method is not supported for this pair of files
+FALLBACK_ERRNOS = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTTY, errno.EBADF,
+                   errno.EOPNOTSUPP, getattr(errno, 'ENOTSUP', errno.EOPNOTSUPP)}
+
+def _try_reflink(src_fd, dst_fd):
+    """Clone the file's extents instead of copying data (btrfs/XFS)"""
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except OSError as e:
+        if e.errno in FALLBACK_ERRNOS:
+            return False
+        raise
+    return True
+
+def _try_copy_file_range(src_fd, dst_fd, size, checkpoint=None):
+    """Copy inside the kernel with copy_file_range"""
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    copied = 0
+    while True:
+        if checkpoint:
+            checkpoint()
+        try:
+            count = os.copy_file_range(src_fd, dst_fd, COPY_CHUNK_SIZE)
+        except OSError as e:
+            if copied == 0 and e.errno in FALLBACK_ERRNOS:
+                return False
+            raise
+        if count == 0:
+            break
+        copied += count
+    # Some filesystems report nothing copied instead of failing
+    return copied > 0 or size == 0
+
+def _try_sendfile(src_fd, dst_fd, size, checkpoint=None):
+    """Copy inside the kernel with sendfile (file to file works on Linux only)"""
+    if not hasattr(os, 'sendfile') or not sys.platform.startswith('linux'):
+        return False
+    copied = 0
+    while True:
+        if checkpoint:
+            checkpoint()
+        try:
+            count = os.sendfile(dst_fd, src_fd, copied, COPY_CHUNK_SIZE)
+        except OSError as e:
+            if copied == 0 and e.errno in FALLBACK_ERRNOS:
+                return False
+            raise
+        if count == 0:
+            break
+        copied += count
+    return copied > 0 or size == 0
+
+def temp_path_for(dst_file):
+    """Temporary name a file is written under before it is renamed to dst_file"""
+    folder, name = os.path.split(dst_file)
+    return os.path.join(folder, f".{name}{PARTIAL_SUFFIX}")
+
+def is_temp_name(name):
+    return name.startswith('.') and name.endswith(PARTIAL_SUFFIX)
+
+def fsync_path(path):
+    """Flush a file or folder that is already written to disk"""
+    # Windows can only flush files opened for writing, and can't open folders
+    if os.name == 'nt':
+        if os.path.isdir(path):
+            return
+        fd = os.open(path, os.O_RDWR | os.O_BINARY)
+    else:
+        fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def new_digest():
+    """Content digest of a copy; the same as dedup.full_hash, so it doubles as the indexed hash"""
+    return hashlib.blake2b()
+
+def _copy_buffered(fsrc, fdst, size, digest=None, checkpoint=None):
+    """Buffered copy, hashing the data on its way through when given a digest; with no fdst it only hashes"""
+    # Small photos don't need a full-size buffer; one extra byte sees the end in one read
+    buffer = bytearray(min(COPY_BUFFER_SIZE, size + 1))
+    view = memoryview(buffer)
+    while True:
+        if checkpoint:
+            checkpoint()
+        count = fsrc.readinto(buffer)
+        if not count:
+            break
+        if digest is not None:
+            digest.update(view[:count])
+        if fdst is not None:
+            fdst.write(view[:count])
+
+def hash_from_disk(path):
+    """Hash a file as stored on disk, dropping it from the page cache first where the OS allows"""
+    digest = new_digest()
+    with open(path, 'rb') as f:
+        # Dirty pages are not dropped, so the file must have been fsynced for this to reach the disk
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        for chunk in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def transfer_file(src_file, dst_file, fsync=False, digest=None, checkpoint=None):
+    """Copy a file using the cheapest method available and return the method's name"""
+    # Reflink clone, then kernel copies, then a plain buffered copy; metadata
+    # is copied afterwards like shutil.copy2. Hashing needs the data to pass
+    # through Python, so with a digest anything but a clone takes the buffered
+    # path. checkpoint() runs between chunks and may raise to abandon the copy
+    with open(src_file, 'rb') as fsrc, open(dst_file, 'wb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(src_fd).st_size
+        
+        if _try_reflink(src_fd, dst_fd):
+            method = 'reflink'
+            if digest is not None:
+                # The clone shares the source's blocks, so hashing the source only reads
+                fsrc.seek(0)
+                _copy_buffered(fsrc, None, size, digest, checkpoint)
+        elif digest is not None:
+            _copy_buffered(fsrc, fdst, size, digest, checkpoint)
+            method = 'hashed'
+        elif _try_copy_file_range(src_fd, dst_fd, size, checkpoint):
+            method = 'copy_file_range'
+        elif _try_sendfile(src_fd, dst_fd, size, checkpoint):
+            method = 'sendfile'
+        else:
+            _copy_buffered(fsrc, fdst, size, checkpoint=checkpoint)
+            method = 'buffered'
+        if fsync:
+            fdst.flush()
+            os.fsync(dst_fd)
+            
+    shutil.copystat(src_file, dst_file)
+    return method
+
+def _write_atomically(src_file, dst_file, fsync, verify, checkpoint=None):
+    """Copy to a temporary name and rename it into place, so dst_file is never partial or unverified"""
+    temp_file = temp_path_for(dst_file)
+    digest = new_digest() if verify != 'none' else None
+    try:
+        # Reading back from disk rather than cache needs the data written out first
+        method = transfer_file(src_file, temp_file, fsync or verify == 'reread', digest, checkpoint)
+        if verify == 'reread' and hash_from_disk(temp_file) != digest.hexdigest():
+            raise OSError(f"Copy of {src_file} does not match the original when read back")
+        os.replace(temp_file, dst_file)
+    except BaseException:
+        try:
+            os.unlink(temp_file)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        # Make the rename itself durable
+        fsync_path(os.path.dirname(dst_file))
+    return method, digest.hexdigest() if digest else None
+
+def copy_one_file(src_file, dst_file, fsync=False, verify='none', checkpoint=None):
+    """Copy a single file with its metadata; runs on a copy worker"""
+    method, content_hash = _write_atomically(src_file, dst_file, fsync, verify, checkpoint)
+    return dst_file, method, os.stat(dst_file).st_mtime_ns, content_hash
+
+def move_one_file(src_file, dst_file, same_device, fsync=True, verify='none', checkpoint=None):
+    """Move a single file, renaming it when source and destination share a device"""
+    if same_device:
+        try:
+            os.rename(src_file, dst_file)
+            return dst_file, 'rename', os.stat(dst_file).st_mtime_ns, None
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+                
+    # Different devices: copy, check the copy, then remove the original
+    method, content_hash = _write_atomically(src_file, dst_file, fsync, verify, checkpoint)
+    if os.path.getsize(dst_file) != os.path.getsize(src_file):
+        os.unlink(dst_file)
+        raise OSError(f"Size mismatch after copying to {dst_file}, original kept")
+    dst_mtime_ns = os.stat(dst_file).st_mtime_ns
+    os.unlink(src_file)
+    return dst_file, method, dst_mtime_ns, content_hash
+
+class SyncBatch:
+    """Files written without fsync, flushed together every so many files or bytes"""
+    def __init__(self, max_files=FSYNC_BATCH_FILES, max_bytes=FSYNC_BATCH_BYTES):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.paths = []
+        self.size = 0
+        
+    def add(self, path, size):
+        """Add a written file; True when the batch is due to be flushed"""
+        self.paths.append(path)
+        self.size += size
+        return len(self.paths) >= self.max_files or self.size >= self.max_bytes
+        
+    def flush(self):
+        """fsync the batch's files, then their folders, and return the files"""
+        paths, self.paths, self.size = self.paths, [], 0
+        for path in paths:
+            fsync_path(path)
+        for folder in {os.path.dirname(path) for path in paths}:
+            fsync_path(folder)
+        return paths
+
+class CopyEngine:
+    """Run copy tasks on a pool of worker threads with a bounded number in flight"""
+    def __init__(self, workers=DEFAULT_COPY_WORKERS):
+        self.workers = max(1, int(workers))
+        
+    def run(self, tasks):
+        """Run (context, func, args) tasks, yielding (context, result, error) as each finishes"""
+        # A failing task only reports its own error; the other workers keep going
+        max_pending = self.workers * 4
+        pending = {}
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for context, func, args in tasks:
+                pending[executor.submit(func, *args)] = context
+                # Wait for a free slot only when full, but report finished tasks either way,
+                # since a streaming source can be slow to hand over the next one
+                done, _ = wait(pending, timeout=None if len(pending) >= max_pending else 0,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._outcome(pending.pop(future), future)
+                        
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._outcome(pending.pop(future), future)
+                    
+    @staticmethod
+    def _outcome(context, future):
+        error = future.exception()
+        return context, (None if error else future.result()), error
@@ -0,0 +1,76 @@
+import os
+
+from .scanner import scan_source
+from .transfer import DEFAULT_COPY_WORKERS, CopyEngine, hash_from_disk
+from .dedup import full_hash
+from .journal import JobJournal, read_journal
+from .engine import SortError
+
+class VerifyReport:
+    """Which source files the backup was shown to hold, and which it wasn't"""
+    def __init__(self):
+        self.verified = []
+        # (source path, reason) for files whose copy didn't check out
+        self.problems = []
+        # Source files the last sort never recorded, e.g. failed copies
+        self.unrecorded = []
+        
+    @property
+    def total_files(self):
+        return len(self.verified) + len(self.problems) + len(self.unrecorded)
+
+def check_copy(src_file, dst_file, expected_hash):
+    """Confirm a backup file holds a source file's data; returns None or the reason it doesn't"""
+    try:
+        dst_size = os.path.getsize(dst_file)
+    except FileNotFoundError:
+        return "missing from the backup"
+    if dst_size != os.path.getsize(src_file):
+        return "size differs from the backup copy"
+    # The backup side is read from disk, not the page cache
+    if expected_hash is None:
+        expected_hash = full_hash(src_file)
+    if hash_from_disk(dst_file) != expected_hash:
+        return "content differs from the backup copy"
+    return None
+
+def verify_sources(source_path, backup_root, workers=DEFAULT_COPY_WORKERS, on_progress=None):
+    """Check every source file against the last sort's manifest and the backup, across a pool of workers"""
+    state = read_journal(backup_root)
+    if state is None or os.path.abspath(state.source_path) != os.path.abspath(source_path):
+        raise SortError("The backup has no record of sorting this folder.")
+        
+    # Scan with the sort's spelling of the path so the manifest's keys match
+    scan = scan_source(state.source_path)
+    report = VerifyReport()
+    total_files = scan.total_files
+    
+    def plan_checks():
+        for scanned in scan.files:
+            entry = state.committed.get(scanned.path)
+            if entry is None:
+                report.unrecorded.append(scanned.path)
+                continue
+            dst_file, size, mtime_ns = entry
+            # The hash taken while copying only describes the source if it hasn't changed since
+            expected_hash = state.hashes.get(dst_file) if (size, mtime_ns) == (scanned.size, scanned.mtime_ns) else None
+            yield scanned, check_copy, (scanned.path, dst_file, expected_hash)
+            
+    journal = JobJournal(backup_root)
+    journal.reopen()
+    try:
+        for scanned, problem, error in CopyEngine(workers).run(plan_checks()):
+            if error:
+                problem = str(error)
+            if problem:
+                report.problems.append((scanned.path, problem))
+                journal.mismatch(scanned.path)
+            else:
+                report.verified.append(scanned.path)
+                journal.verified(scanned.path, scanned.size, scanned.mtime_ns)
+            if on_progress:
+                done = report.total_files
+                on_progress(done / max(1, total_files) * 100, f"Verified {done}/{total_files}")
+    finally:
+        journal.close()
+    return report